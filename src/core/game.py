@@ -4,6 +4,7 @@ import os
 from src.entities.bird import Bird
 from src.entities.pipe import Pipe
 from src.utils.constants import *
+from src.utils.frame_timer import FrameTimer
 
 class FlappyGame:
     def __init__(self, sound_enabled=True):
@@ -42,13 +43,29 @@ class FlappyGame:
             self.sound_die = self.sound_hit = self.sound_point = self.sound_wing = None
             
         self.font = pygame.font.Font(None, 74)
+        self.frame_timer = FrameTimer()
+        
+        # Load score digits once instead of on every frame
+        try:
+            self.number_images = [
+                pygame.transform.scale(pygame.image.load(NUMBER_SPRITES[i]).convert_alpha(), (30, 45))
+                for i in range(10)
+            ]
+        except (pygame.error, FileNotFoundError):
+            self.number_images = None
+        
         self.birds = []  # List to hold multiple birds
         
         # Initialize game state
         self.score = 0
         self.last_pipe = 0
+        self.frame = 0
         self.game_state = STATE_PLAYING
         
+        # Time pipes by frames instead of the wall clock, so the course does
+        # not depend on how fast frames are simulated (used for training)
+        self.frame_clock = False
+        
         # Add initial bird
         self.add_bird()
         
@@ -60,6 +77,7 @@ class FlappyGame:
         self.add_bird()
         self.score = 0
         self.last_pipe = 0
+        self.frame = 0
         self.game_state = STATE_PLAYING
         
     def add_bird(self):
@@ -73,7 +91,7 @@ class FlappyGame:
         if self.game_state != STATE_PLAYING:
             return
             
-        current_time = pygame.time.get_ticks()
+        current_time = self.pipe_clock()
         if current_time - self.last_pipe > PIPE_SPAWN_TIME:
             # Check if we need to spawn new pipes
             spawn_new = True
@@ -110,6 +128,13 @@ class FlappyGame:
                 self.all_sprites.add(top_pipe, bottom_pipe)
                 self.last_pipe = current_time
             
+    def pipe_clock(self):
+        """Milliseconds used to time pipe spawns"""
+        if self.frame_clock:
+            # Starts past PIPE_SPAWN_TIME so the first pipe spawns right away
+            return PIPE_SPAWN_TIME + 1 + self.frame * 1000 // FPS
+        return pygame.time.get_ticks()
+            
     def check_collisions(self, bird):
         """Check collisions for a specific bird"""
         if bird.rect.top <= 0 or bird.rect.bottom >= WINDOW_HEIGHT:
@@ -159,6 +184,8 @@ class FlappyGame:
             # Game over only if all birds are dead
             if not self.birds:
                 self.game_state = STATE_GAME_OVER
+            
+            self.frame += 1
                 
     def draw(self):
         # Draw background
@@ -171,16 +198,13 @@ class FlappyGame:
         score_str = str(int(self.score))
         x_offset = WINDOW_WIDTH // 2 - (len(score_str) * 30) // 2
         
-        for digit in score_str:
-            try:
-                number_image = pygame.image.load(NUMBER_SPRITES[int(digit)]).convert_alpha()
-                number_image = pygame.transform.scale(number_image, (30, 45))
-                self.screen.blit(number_image, (x_offset, 50))
+        if self.number_images:
+            for digit in score_str:
+                self.screen.blit(self.number_images[int(digit)], (x_offset, 50))
                 x_offset += 30
-            except (pygame.error, FileNotFoundError):
-                score_text = self.font.render(score_str, True, WHITE)
-                self.screen.blit(score_text, (WINDOW_WIDTH//2 - score_text.get_width()//2, 50))
-                break
+        else:
+            score_text = self.font.render(score_str, True, WHITE)
+            self.screen.blit(score_text, (WINDOW_WIDTH//2 - score_text.get_width()//2, 50))
         
         # Draw game over screen
         if self.game_state == STATE_GAME_OVER and self.gameover_image:
@@ -206,11 +230,19 @@ class FlappyGame:
                     
     def run(self):
         while self.running:
+            if self.game_state == STATE_GAME_OVER:
+                # Nothing moves on the game over screen; sleep until input arrives
+                event = pygame.event.wait(IDLE_EVENT_TIMEOUT)
+                if event.type != pygame.NOEVENT:
+                    pygame.event.post(event)
             self.handle_input()
+            self.frame_timer.start()
             self.update()
             self.draw()
+            self.frame_timer.stop()
             self.clock.tick(FPS)
-        pygame.quit() 
+        print(self.frame_timer.summary())
+        pygame.quit()
 
     def play_sound(self, sound):
         if self.sound_enabled and sound is not None:
@@ -221,7 +253,7 @@ class FlappyGame:
         self.running = True
         
         while self.running:
-            # Handle events
+            # Sample input right before the physics step it affects
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
@@ -234,32 +266,39 @@ class FlappyGame:
                         elif self.game_state == STATE_GAME_OVER:
                             self.reset_game()
             
+            self.frame_timer.start()
+            
             # Update game state
             self.update()
             
             # Draw everything
             self.draw()
             
-            # Cap the framerate
+            self.frame_timer.stop()
+            
+            # Cap the framerate (sleeps, rather than spins, until the next frame)
             self.clock.tick(FPS)
             
             # Check for game over
             if self.game_state == STATE_GAME_OVER:
                 print(f"Game Over! Score: {self.score}")
-                # Wait for space to restart or quit
+                print(self.frame_timer.summary())
+                # Block until space restarts or the player quits
                 waiting = True
                 while waiting and self.running:
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
+                    event = pygame.event.wait(IDLE_EVENT_TIMEOUT)
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                        waiting = False
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE:
+                            self.reset_game()
+                            waiting = False
+                        elif event.key == pygame.K_ESCAPE:
                             self.running = False
                             waiting = False
-                        elif event.type == pygame.KEYDOWN:
-                            if event.key == pygame.K_SPACE:
-                                self.reset_game()
-                                waiting = False
-                            elif event.key == pygame.K_ESCAPE:
-                                self.running = False
-                                waiting = False
+                # Restart the frame clock so the wait doesn't count as a frame
+                self.clock.tick()
         
         pygame.quit()
         
\ No newline at end of file
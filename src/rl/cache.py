@@ -0,0 +1,129 @@
+"""Reuse networks and fitness for genomes that come back unchanged.
+
+With elitism the best genomes of a generation are copied into the next one
+as they are. EvaluationCache keys each genome by a hash of its structure, so
+their networks are built only once. When they play a course seed they
+already played, the stored fitness is reused as well. Headless episodes are
+deterministic for a given seed, max_frames, fitness shaping and action
+repeat, so a reused fitness is exactly what a new episode would give. Both stores are bounded
+LRU maps.
+"""
+import hashlib
+from collections import OrderedDict
+import neat
+from src.rl.fitness import DefaultShaping
+from src.rl.headless import DEFAULT_MAX_FRAMES, evaluate_policies
+
+
+def structural_hash(genome) -> str:
+    """Hash of everything that affects a genome's network"""
+    nodes = sorted((k, n.bias, n.response, n.activation, n.aggregation)
+                   for k, n in genome.nodes.items())
+    connections = sorted((k, c.weight) for k, c in genome.connections.items() if c.enabled)
+    return hashlib.blake2b(repr((nodes, connections)).encode(), digest_size=16).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int):
+        """Mapping that drops the least recently used entry past ``maxsize``"""
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+class EvaluationCache:
+    def __init__(self, max_networks=1000, max_fitness=10000):
+        """Networks keyed by genome structure, fitness by structure and episode"""
+        self.networks = LRUCache(max_networks)
+        self.fitness = LRUCache(max_fitness)
+
+    def __getstate__(self):
+        # Trainer checkpoints pickle the reporters; keep the entries out of them
+        state = self.__dict__.copy()
+        state['networks'] = LRUCache(self.networks.maxsize)
+        state['fitness'] = LRUCache(self.fitness.maxsize)
+        return state
+
+    def network(self, genome, config, key=None):
+        """Build the genome's network, or reuse one built for the same structure"""
+        if key is None:
+            key = structural_hash(genome)
+        net = self.networks.get(key)
+        if net is None:
+            net = neat.nn.FeedForwardNetwork.create(genome, config)
+            self.networks.put(key, net)
+        return net
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current sizes of both stores"""
+        return {
+            'network_hits': self.networks.hits,
+            'network_misses': self.networks.misses,
+            'networks': len(self.networks),
+            'fitness_hits': self.fitness.hits,
+            'fitness_misses': self.fitness.misses,
+            'fitness_entries': len(self.fitness),
+        }
+
+    def evaluate(self, genomes, config, seed: int, max_frames: int = DEFAULT_MAX_FRAMES,
+                 stats: dict = None, shaping=None, action_repeat: int = 1):
+        """Fitness of each genome on one course, simulating only the ones not seen yet.
+
+        Genomes with the same structure share a single bird.
+        """
+        if shaping is None:
+            shaping = DefaultShaping()
+        episode = (seed, max_frames, shaping.key(), action_repeat)
+        keys = [structural_hash(g) for g in genomes]
+        fitness = [self.fitness.get((k,) + episode) for k in keys]
+
+        pending = {}
+        for i, f in enumerate(fitness):
+            if f is None:
+                pending.setdefault(keys[i], i)
+        if pending:
+            networks = [self.network(genomes[i], config, key) for key, i in pending.items()]
+            results = evaluate_policies(networks, seed, max_frames, stats=stats, shaping=shaping,
+                                        action_repeat=action_repeat)
+            played = dict(zip(pending, results))
+            for key, f in played.items():
+                self.fitness.put((key,) + episode, f)
+            fitness = [played[k] if f is None else f for k, f in zip(keys, fitness)]
+        return fitness
+
+
+class CacheReporter(neat.reporting.BaseReporter):
+    def __init__(self, cache: EvaluationCache):
+        """Print cache hit rates after every generation"""
+        self.cache = cache
+
+    def end_generation(self, config, population, species_set):
+        stats = self.cache.stats()
+        lookups = stats['network_hits'] + stats['network_misses']
+        if not lookups:
+            return
+        played = stats['fitness_hits'] + stats['fitness_misses']
+        print(f"Evaluation cache: networks {stats['network_hits']}/{lookups} hits "
+              f"({stats['networks']} stored), fitness {stats['fitness_hits']}/{played} hits "
+              f"({stats['fitness_entries']} stored)")
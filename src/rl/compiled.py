@@ -0,0 +1,217 @@
+"""Dependency-free compiled policies.
+
+A genome is exported to a small JSON artifact holding only the nodes that
+feed the output, already in evaluation order. Loading one needs neither
+neat-python, neat_config.txt nor pickle, and CompiledPolicy evaluates a
+single observation with generated straight-line Python or a whole batch
+with NumPy.
+
+Usage: python -m src.rl.compiled <model.pkl> [output.json]
+"""
+import json
+import math
+import os
+import sys
+import numpy as np
+
+FORMAT_NAME = 'flappy-policy'
+FORMAT_VERSION = 1
+
+# Scalar activations, matching neat.activations exactly
+ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + math.exp(-max(-60.0, min(60.0, 5.0 * z)))),
+    'tanh': lambda z: math.tanh(max(-60.0, min(60.0, 2.5 * z))),
+    'relu': lambda z: z if z > 0.0 else 0.0,
+    'identity': lambda z: z,
+    'clamped': lambda z: max(-1.0, min(1.0, z)),
+    'abs': lambda z: abs(z),
+    'sin': lambda z: math.sin(max(-60.0, min(60.0, 5.0 * z))),
+    'gauss': lambda z: math.exp(-5.0 * max(-3.4, min(3.4, z)) ** 2),
+}
+
+# The same activations over NumPy arrays
+NP_ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    'tanh': lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    'relu': lambda z: np.maximum(z, 0.0),
+    'identity': lambda z: z,
+    'clamped': lambda z: np.clip(z, -1.0, 1.0),
+    'abs': np.abs,
+    'sin': lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    'gauss': lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+}
+
+
+def compile_genome(genome, config, metadata=None) -> dict:
+    """Prune and order a genome into an exportable policy spec"""
+    import neat
+
+    # neat already drops nodes that cannot reach an output and orders the rest
+    network = neat.nn.FeedForwardNetwork.create(genome, config)
+    nodes = []
+    for node, _, _, bias, response, links in network.node_evals:
+        gene = genome.nodes[node]
+        if gene.activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation for export: {gene.activation}")
+        if gene.aggregation != 'sum':
+            raise ValueError(f"Unsupported aggregation for export: {gene.aggregation}")
+        nodes.append({
+            'key': node,
+            'activation': gene.activation,
+            'bias': bias,
+            'response': response,
+            'inputs': [[i, w] for i, w in links],
+        })
+
+    spec = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'input_keys': list(network.input_nodes),
+        'output_keys': list(network.output_nodes),
+        'nodes': nodes,
+        'fitness': genome.fitness,
+    }
+    if metadata:
+        spec.update({k: v for k, v in metadata.items() if k not in spec})
+    return spec
+
+
+def export_genome(genome, config, path: str, metadata=None) -> dict:
+    """Compile a genome and write it to ``path``"""
+    spec = compile_genome(genome, config, metadata)
+    with open(path, 'w') as f:
+        json.dump(spec, f)
+    return spec
+
+
+class CompiledPolicy:
+    def __init__(self, spec: dict):
+        """Build an evaluator from a compiled policy spec"""
+        if spec.get('format') != FORMAT_NAME:
+            raise ValueError("Not a compiled flappy policy")
+        if spec.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported policy version: {spec.get('version')}")
+        for node in spec['nodes']:
+            # Same checks as compile_genome, for files written elsewhere or edited by hand
+            if node['activation'] not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation in compiled policy: {node['activation']}")
+            if node.get('aggregation', 'sum') != 'sum':
+                raise ValueError(f"Unsupported aggregation in compiled policy: {node['aggregation']}")
+        self.spec = spec
+        self.metadata = {k: v for k, v in spec.items()
+                         if k not in ('format', 'version', 'input_keys', 'output_keys', 'nodes')}
+        self.num_inputs = len(spec['input_keys'])
+
+        # Every node key gets a slot: inputs first, then outputs, then hidden
+        slots = {}
+        for key in spec['input_keys'] + spec['output_keys']:
+            slots.setdefault(key, len(slots))
+        for node in spec['nodes']:
+            slots.setdefault(node['key'], len(slots))
+        self.num_slots = len(slots)
+        self.output_slots = [slots[k] for k in spec['output_keys']]
+
+        self._activate = self._build_scalar(spec['nodes'], slots)
+
+        # Group consecutive nodes that do not depend on each other so the
+        # batch path can evaluate each group with one matrix product
+        self._groups = []
+        group, written = [], set()
+        for node in spec['nodes']:
+            sources = {slots[i] for i, _ in node['inputs']}
+            if sources & written:
+                self._groups.append(self._build_group(group, slots))
+                group, written = [], set()
+            group.append(node)
+            written.add(slots[node['key']])
+        if group:
+            self._groups.append(self._build_group(group, slots))
+
+    def _build_scalar(self, nodes, slots):
+        # Generate straight-line Python for the network; the additions keep
+        # neat's left-to-right order so results match it bit for bit
+        lines = ["def activate(v):"]
+        for node in nodes:
+            terms = ' + '.join(f"v[{slots[i]}] * {float(w)!r}" for i, w in node['inputs']) or '0.0'
+            lines.append(f"    v[{slots[node['key']]}] = {node['activation']}("
+                         f"{float(node['bias'])!r} + {float(node['response'])!r} * ({terms}))")
+        lines.append(f"    return [{', '.join(f'v[{i}]' for i in self.output_slots)}]")
+        namespace = {name: ACTIVATIONS[name] for name in {node['activation'] for node in nodes}}
+        exec(compile('\n'.join(lines), '<compiled policy>', 'exec'), namespace)
+        return namespace['activate']
+
+    def _build_group(self, nodes, slots):
+        weights = np.zeros((self.num_slots, len(nodes)))
+        for col, node in enumerate(nodes):
+            for i, w in node['inputs']:
+                weights[slots[i], col] += w
+        targets = np.array([slots[node['key']] for node in nodes], dtype=np.intp)
+        bias = np.array([node['bias'] for node in nodes])
+        response = np.array([node['response'] for node in nodes])
+        by_activation = {}
+        for col, node in enumerate(nodes):
+            by_activation.setdefault(node['activation'], []).append(col)
+        activations = [(NP_ACTIVATIONS[name], np.array(cols, dtype=np.intp))
+                       for name, cols in by_activation.items()]
+        return weights, targets, bias, response, activations
+
+    @classmethod
+    def from_file(cls, path: str) -> 'CompiledPolicy':
+        """Load a policy written by export_genome"""
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def activate(self, inputs):
+        """Evaluate one observation, returning the outputs as a list"""
+        if len(inputs) != self.num_inputs:
+            raise RuntimeError(f"Expected {self.num_inputs} inputs, got {len(inputs)}")
+        values = [0.0] * self.num_slots
+        values[:self.num_inputs] = inputs
+        return self._activate(values)
+
+    def activate_batch(self, observations) -> np.ndarray:
+        """Evaluate an (n, num_inputs) array, returning (n, num_outputs)"""
+        observations = np.asarray(observations, dtype=np.float64)
+        if observations.ndim != 2 or observations.shape[1] != self.num_inputs:
+            raise RuntimeError(f"Expected shape (n, {self.num_inputs}), got {observations.shape}")
+        values = np.zeros((observations.shape[0], self.num_slots))
+        values[:, :self.num_inputs] = observations
+        for weights, targets, bias, response, activations in self._groups:
+            pre = bias + response * (values @ weights)
+            for act, cols in activations:
+                values[:, targets[cols]] = act(pre[:, cols])
+        return values[:, self.output_slots]
+
+
+def load_compiled(path: str) -> CompiledPolicy:
+    """Load a compiled policy artifact"""
+    return CompiledPolicy.from_file(path)
+
+
+def main():
+    from src.rl.policy import load_checkpoint, extract_genome, load_config
+    from src.utils.constants import MODELS_DIR
+
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        return
+    model_path = sys.argv[1]
+    if not os.path.exists(model_path):
+        model_path = os.path.join(MODELS_DIR, model_path)
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(model_path)[0] + '.json'
+
+    checkpoint = load_checkpoint(model_path)
+    genome = extract_genome(checkpoint)
+    if genome is None:
+        print(f"Could not find valid genome in checkpoint: {model_path}")
+        return
+    metadata = None
+    if isinstance(checkpoint, dict):
+        metadata = {k: checkpoint[k] for k in ('generation', 'score', 'action_repeat')
+                    if k in checkpoint}
+    spec = export_genome(genome, load_config(), output_path, metadata)
+    print(f"Exported {len(spec['nodes'])} nodes to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
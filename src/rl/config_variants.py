@@ -0,0 +1,58 @@
+"""Derived NEAT configs that leave neat_config.txt untouched.
+
+Overrides map a config key to its new value. A bare key such as
+``pop_size`` is looked up in whichever section defines it; use
+``Section.key`` (e.g. ``DefaultSpeciesSet.compatibility_threshold``) to be
+explicit. Variants are written to temporary files because neat.Config only
+reads from a path.
+"""
+import configparser
+import os
+import tempfile
+
+
+def apply_overrides(base_path: str, overrides=None) -> configparser.ConfigParser:
+    """Read base_path and apply overrides, raising KeyError for unknown keys"""
+    parser = configparser.ConfigParser(inline_comment_prefixes=('#',))
+    parser.read(base_path)
+    for name, value in (overrides or {}).items():
+        if '.' in name:
+            section, key = name.split('.', 1)
+            if not parser.has_option(section, key):
+                raise KeyError(f"Unknown config key: {name}")
+        else:
+            sections = [s for s in parser.sections() if parser.has_option(s, name)]
+            if not sections:
+                raise KeyError(f"Unknown config key: {name}")
+            section, key = sections[0], name
+        if isinstance(value, bool):
+            value = 'True' if value else 'False'
+        parser.set(section, key, str(value))
+    return parser
+
+
+def write_config(base_path: str, overrides=None, path=None) -> str:
+    """Write base_path with overrides applied and return the new file's path"""
+    parser = apply_overrides(base_path, overrides)
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='neat_config_', suffix='.txt')
+        os.close(fd)
+    with open(path, 'w') as f:
+        parser.write(f)
+    return path
+
+
+def load_neat_config(config_path: str):
+    """Load a training config using the project's speciation backend"""
+    import neat
+    from src.rl.speciation import FastSpeciesSet
+
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_path
+    )
+    config.species_set_type = FastSpeciesSet
+    return config
@@ -0,0 +1,117 @@
+"""Pre-generated headless courses in a memory-mapped file.
+
+Row ``s`` of a bank holds the first gap centers of Course(s), drawn with the
+same FlappyGame.spawn_pipes rules. The file is a plain .npy array opened
+with ``mmap_mode='r'``. Every process that uses it shares the same
+read-only pages, and nothing is drawn from an RNG while evaluating. A course
+that outlives its row falls back to the RNG, so results are identical with
+or without a bank.
+
+The active bank is named by the FLAPPY_COURSE_BANK environment variable, so
+pool and island processes started from a training run pick it up too.
+While a bank is active, new course seeds are drawn from its rows.
+
+Usage: python -m src.rl.course_bank [courses] [pipes] [output.npy]
+"""
+import os
+import sys
+import numpy as np
+from src.utils.constants import MODELS_DIR
+
+BANK_ENV = 'FLAPPY_COURSE_BANK'
+DEFAULT_PATH = os.path.join(MODELS_DIR, 'course_bank.npy')
+DEFAULT_COURSES = 10000
+
+_banks = {}
+
+
+def default_pipes():
+    """Pipes per course needed for a full DEFAULT_MAX_FRAMES episode"""
+    from src.rl.headless import DEFAULT_MAX_FRAMES, PIPE_SPAWN_FRAMES
+    return DEFAULT_MAX_FRAMES // (PIPE_SPAWN_FRAMES + 1) + 2
+
+
+def generate_bank(path=DEFAULT_PATH, courses=DEFAULT_COURSES, pipes=None):
+    """Write gap centers for seeds 0..courses-1 to path and return the path"""
+    from src.rl.headless import Course
+
+    if pipes is None:
+        pipes = default_pipes()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    bank = np.lib.format.open_memmap(path, mode='w+', dtype=np.int16, shape=(courses, pipes))
+    for seed in range(courses):
+        course = Course(seed)
+        bank[seed] = [course.next_gap_center() for _ in range(pipes)]
+    bank.flush()
+    del bank
+    return path
+
+
+def open_bank(path):
+    """Map a bank read-only; repeated calls in a process share one mapping"""
+    path = os.path.abspath(path)
+    if path not in _banks:
+        _banks[path] = np.load(path, mmap_mode='r')
+    return _banks[path]
+
+
+def use_course_bank(path=DEFAULT_PATH):
+    """Make path the active bank for this process and any it starts"""
+    os.environ[BANK_ENV] = os.path.abspath(path)
+    return open_bank(path)
+
+
+def active_bank():
+    """The bank named by FLAPPY_COURSE_BANK, or None"""
+    path = os.environ.get(BANK_ENV)
+    return open_bank(path) if path else None
+
+
+def draw_seed(rng):
+    """A new course seed: a bank row while a bank is active, any seed otherwise"""
+    bank = active_bank()
+    if bank is not None:
+        return rng.randrange(len(bank))
+    return rng.randrange(2**31)
+
+
+class BankCourse:
+    """Course read from a bank row, continuing with the RNG past its end"""
+
+    def __init__(self, seed, row):
+        self.seed = seed
+        self._row = row.tolist()
+        self._next = 0
+        self._course = None
+
+    def next_gap_center(self):
+        if self._next < len(self._row):
+            self._next += 1
+            return self._row[self._next - 1]
+        if self._course is None:
+            from src.rl.headless import Course
+            self._course = Course(self.seed)
+            for _ in range(len(self._row)):
+                self._course.next_gap_center()
+        return self._course.next_gap_center()
+
+
+def bank_course(seed):
+    """BankCourse for seed if the active bank has it, else None"""
+    bank = active_bank()
+    if bank is None or not 0 <= seed < len(bank):
+        return None
+    return BankCourse(seed, bank[seed])
+
+
+def main():
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COURSES
+    pipes = int(sys.argv[2]) if len(sys.argv) > 2 else default_pipes()
+    path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_PATH
+    generate_bank(path, courses, pipes)
+    print(f"Wrote {courses} courses of {pipes} pipes to {path}")
+    print(f"Use it with: {BANK_ENV}={os.path.abspath(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Coordinator/worker evaluation over TCP.
+
+The coordinator splits each generation into batches of compiled policies
+(see src.rl.compiled) that share one course seed and hands them to whichever
+workers have spare capacity. Workers score them with the headless game and
+send the fitness values back. Every message is a 4-byte big-endian length
+followed by a UTF-8 JSON object:
+
+    worker -> coordinator  {"type": "hello", "name": ...}
+    worker -> coordinator  {"type": "heartbeat"}
+    coordinator -> worker  {"type": "batch", "batch_id", "seed", "max_frames", "shaping",
+                            "action_repeat", "policies"}
+    worker -> coordinator  {"type": "result", "batch_id", "fitness"}
+    coordinator -> worker  {"type": "shutdown"}
+
+A worker that disconnects or misses heartbeats for ``heartbeat_timeout``
+seconds, or stops reading for as long, is dropped and its unfinished
+batches go back on the queue. Each
+worker holds at most ``max_inflight`` batches, so the coordinator only
+compiles and sends work as fast as the cluster consumes it.
+
+Usage: python -m src.rl.distributed coordinator <port> [generations]
+       python -m src.rl.distributed worker <host> <port>
+"""
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from src.rl.course_bank import draw_seed
+from src.rl.headless import DEFAULT_MAX_FRAMES
+
+_HEADER = struct.Struct('>I')
+
+
+def send_message(sock, message: dict):
+    """Send one length-prefixed JSON message"""
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def recv_message(sock):
+    """Receive one message, or None once the peer has closed the connection"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exact(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+
+class _WorkerConnection:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.inflight = set()
+        self.last_seen = time.time()
+        self.alive = True
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            send_message(self.sock, message)
+
+
+class Coordinator:
+    def __init__(self, host='127.0.0.1', port=0, batch_size=64, max_inflight=2,
+                 heartbeat_timeout=10.0, max_frames=DEFAULT_MAX_FRAMES, seed=None, shaping=None,
+                 action_repeat=1):
+        """Accept workers on host:port (port 0 picks a free one)"""
+        self.batch_size = batch_size
+        self.max_inflight = max_inflight
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_frames = max_frames
+        self.shaping = shaping
+        self.action_repeat = action_repeat
+        self._rng = random.Random(seed)
+
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+        self._cond = threading.Condition()
+        self._workers = []
+        self._closed = False
+        self._batches = {}
+        self._pending = deque()
+        self._results = {}
+        self._next_batch_id = 0
+
+        self._accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._accept_thread.start()
+
+    @property
+    def num_workers(self):
+        with self._cond:
+            return len(self._workers)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                sock, address = self._server.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # A send to a worker that stopped reading fails instead of hanging
+            sock.settimeout(self.heartbeat_timeout)
+            worker = _WorkerConnection(sock, address)
+            with self._cond:
+                self._workers.append(worker)
+                self._cond.notify_all()
+            threading.Thread(target=self._read_loop, args=(worker,), daemon=True).start()
+
+    def _read_loop(self, worker):
+        while True:
+            try:
+                message = recv_message(worker.sock)
+            except (OSError, ValueError):
+                message = None
+            with self._cond:
+                if message is None:
+                    self._drop_worker(worker, "disconnected")
+                    return
+                worker.last_seen = time.time()
+                if message.get('type') == 'hello':
+                    worker.name = message.get('name') or worker.name
+                elif message.get('type') == 'result':
+                    batch_id = message['batch_id']
+                    worker.inflight.discard(batch_id)
+                    # A re-dispatched batch may come back twice; keep the first
+                    if batch_id in self._batches and batch_id not in self._results:
+                        self._results[batch_id] = message['fitness']
+                self._cond.notify_all()
+
+    def _drop_worker(self, worker, reason):
+        # Caller holds self._cond
+        if not worker.alive:
+            return
+        worker.alive = False
+        if worker in self._workers:
+            self._workers.remove(worker)
+        lost = [b for b in worker.inflight if b in self._batches and b not in self._results]
+        self._pending.extendleft(lost)
+        worker.inflight.clear()
+        try:
+            worker.sock.close()
+        except OSError:
+            pass
+        print(f"Worker {worker.name} {reason}, re-queued {len(lost)} batches")
+        self._cond.notify_all()
+
+    def evaluate(self, genomes, config, seed=None):
+        """Set ``fitness`` on every genome using the connected workers"""
+        from src.rl.compiled import compile_genome
+
+        if seed is None:
+            seed = draw_seed(self._rng)
+        genome_list = [genome for _, genome in genomes]
+        batches = [genome_list[start:start + self.batch_size]
+                   for start in range(0, len(genome_list), self.batch_size)]
+        # Compile before taking the lock; a re-queued batch reuses its message
+        compiled = [[compile_genome(g, config) for g in batch] for batch in batches]
+        shaping = self.shaping.spec() if self.shaping else None
+
+        with self._cond:
+            batch_ids = []
+            messages = {}
+            for batch, policies in zip(batches, compiled):
+                batch_id = self._next_batch_id
+                self._next_batch_id += 1
+                self._batches[batch_id] = batch
+                self._pending.append(batch_id)
+                batch_ids.append(batch_id)
+                messages[batch_id] = {
+                    'type': 'batch',
+                    'batch_id': batch_id,
+                    'seed': seed,
+                    'max_frames': self.max_frames,
+                    'shaping': shaping,
+                    'action_repeat': self.action_repeat,
+                    'policies': policies,
+                }
+
+        while True:
+            # Only assign batches under the lock: a send can block on a worker
+            # that stopped reading, and the reader threads need the lock meanwhile
+            with self._cond:
+                if all(b in self._results for b in batch_ids):
+                    break
+                if self._closed:
+                    raise RuntimeError("Coordinator closed during evaluation")
+                now = time.time()
+                for worker in list(self._workers):
+                    if now - worker.last_seen > self.heartbeat_timeout:
+                        self._drop_worker(worker, "timed out")
+
+                sends = []
+                for worker in list(self._workers):
+                    while self._pending and len(worker.inflight) < self.max_inflight:
+                        batch_id = self._pending.popleft()
+                        if batch_id in self._results:
+                            continue
+                        worker.inflight.add(batch_id)
+                        sends.append((worker, batch_id))
+                if not sends:
+                    self._cond.wait(timeout=0.5)
+
+            for worker, batch_id in sends:
+                if not worker.alive:
+                    continue
+                try:
+                    worker.send(messages[batch_id])
+                except OSError:
+                    with self._cond:
+                        self._drop_worker(worker, "disconnected")
+
+        with self._cond:
+            for batch_id in batch_ids:
+                batch = self._batches.pop(batch_id)
+                for genome, fitness in zip(batch, self._results.pop(batch_id)):
+                    genome.fitness = fitness
+
+    def close(self):
+        """Tell workers to stop and shut the server down"""
+        with self._cond:
+            self._closed = True
+            workers = list(self._workers)
+            self._cond.notify_all()
+        for worker in workers:
+            try:
+                worker.send({'type': 'shutdown'})
+                worker.sock.close()
+            except OSError:
+                pass
+        self._server.close()
+
+
+def run_worker(host: str, port: int, heartbeat_interval=2.0, name=None):
+    """Connect to a coordinator and evaluate batches until told to stop"""
+    from src.rl.compiled import CompiledPolicy
+    from src.rl.fitness import shaping_from_spec
+    from src.rl.headless import evaluate_policies
+
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    send_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message):
+        with send_lock:
+            send_message(sock, message)
+
+    def heartbeat():
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send({'type': 'heartbeat'})
+            except OSError:
+                return
+
+    send({'type': 'hello', 'name': name or f"{socket.gethostname()}:{sock.getsockname()[1]}"})
+    threading.Thread(target=heartbeat, daemon=True).start()
+    evaluated = 0
+    try:
+        while True:
+            try:
+                message = recv_message(sock)
+            except OSError:
+                break
+            if message is None or message.get('type') == 'shutdown':
+                break
+            if message.get('type') == 'batch':
+                policies = [CompiledPolicy(spec) for spec in message['policies']]
+                shaping = shaping_from_spec(message.get('shaping'))
+                fitness = evaluate_policies(policies, message['seed'], message['max_frames'],
+                                            shaping=shaping,
+                                            action_repeat=message.get('action_repeat', 1))
+                send({'type': 'result', 'batch_id': message['batch_id'], 'fitness': fitness})
+                evaluated += len(policies)
+    finally:
+        stopped.set()
+        sock.close()
+    return evaluated
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == 'coordinator':
+        from src.rl.policy import DEFAULT_CONFIG_PATH
+        from src.rl.train import NEATTrainer
+
+        generations = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+        coordinator = Coordinator(host='0.0.0.0', port=int(sys.argv[2]))
+        print(f"Coordinator listening on port {coordinator.address[1]}")
+        trainer = NEATTrainer(DEFAULT_CONFIG_PATH, control_panel=False)
+        try:
+            winner = trainer.train_distributed(coordinator, generations)
+        finally:
+            coordinator.close()
+        print(f"Best fitness: {winner.fitness if winner else None}")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'worker':
+        evaluated = run_worker(sys.argv[2], int(sys.argv[3]))
+        print(f"Worker finished after evaluating {evaluated} genomes")
+    else:
+        print(__doc__.strip().split('Usage: ')[-1])
+
+
+if __name__ == "__main__":
+    main()
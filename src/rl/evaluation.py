@@ -0,0 +1,119 @@
+"""Headless fitness evaluators for NEATTrainer.train_headless.
+
+HeadlessEvaluator gives every genome one full episode on a fresh course,
+the same as eval_genomes. SuccessiveHalvingEvaluator spends less compute on
+weak genomes. Everyone first plays a short episode. Only the best fraction
+advances to longer episodes on more courses, and that repeats until the
+final stage.
+
+Both accept an EvaluationCache (src.rl.cache). With a cache, genomes that
+come back unchanged keep their networks, and episodes they already played
+are not simulated again.
+"""
+import math
+import random
+import neat
+from src.rl.cache import EvaluationCache
+from src.rl.course_bank import draw_seed
+from src.rl.headless import DEFAULT_MAX_FRAMES, evaluate_policies
+
+# (courses, max_frames) per stage: survivors get longer episodes on more courses
+DEFAULT_STAGES = ((1, 500), (2, 2000), (3, DEFAULT_MAX_FRAMES))
+
+
+def _play(cache, genomes, config, seed, max_frames, stats, shaping, action_repeat):
+    """Fitness of each genome on one course, through the cache if there is one"""
+    if cache is not None:
+        return cache.evaluate(genomes, config, seed, max_frames, stats=stats, shaping=shaping,
+                              action_repeat=action_repeat)
+    networks = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    return evaluate_policies(networks, seed, max_frames, stats=stats, shaping=shaping,
+                             action_repeat=action_repeat)
+
+
+class HeadlessEvaluator:
+    def __init__(self, max_frames=DEFAULT_MAX_FRAMES, seed=None, courses=None, cache=None,
+                 shaping=None, action_repeat=1):
+        """One episode per genome every generation.
+
+        By default every generation gets a new course. With ``courses`` set,
+        generations cycle through that many fixed courses instead, so elites
+        replaying a course can take their fitness from ``cache``. ``shaping``
+        defaults to the original reward (see src.rl.fitness).
+        """
+        self.max_frames = max_frames
+        self._rng = random.Random(seed)
+        self.course_seeds = [draw_seed(self._rng) for _ in range(courses or 0)]
+        self.cache = cache
+        self.shaping = shaping
+        self.action_repeat = action_repeat
+        self.generation = 0
+        self.last_stats = {}
+
+    def evaluate(self, genomes, config):
+        """Set ``fitness`` on every (genome_id, genome) pair"""
+        if self.course_seeds:
+            seed = self.course_seeds[self.generation % len(self.course_seeds)]
+        else:
+            seed = draw_seed(self._rng)
+        self.generation += 1
+        self.last_stats = {}
+        fitness = _play(self.cache, [g for _, g in genomes], config, seed, self.max_frames,
+                        self.last_stats, self.shaping, self.action_repeat)
+        for (_, genome), f in zip(genomes, fitness):
+            genome.fitness = f
+
+
+class SuccessiveHalvingEvaluator:
+    def __init__(self, stages=DEFAULT_STAGES, keep_fraction=0.25, min_keep=2, seed=None,
+                 cache=None, shaping=None, action_repeat=1):
+        """Staged evaluation; ``stages`` lists (courses, max_frames) per stage.
+
+        After each stage but the last, only the top ``keep_fraction`` of the
+        genomes (at least ``min_keep``) move on.
+        """
+        if not stages:
+            raise ValueError("Need at least one stage")
+        self.stages = tuple(stages)
+        self.keep_fraction = keep_fraction
+        self.min_keep = min_keep
+        self._rng = random.Random(seed)
+        self.cache = cache
+        self.shaping = shaping
+        self.action_repeat = action_repeat
+        self.last_stats = {}
+
+    def evaluate(self, genomes, config):
+        """Set ``fitness`` on every (genome_id, genome) pair.
+
+        A genome's fitness is the sum of its mean episode fitness over the
+        stages it reached. The shipped fitness shapings always score an
+        episode above zero, and selection uses the same running sum. So a
+        genome that went further never ends up below one that was cut earlier.
+        """
+        # Survivors keep their networks between stages even without a shared cache
+        cache = self.cache if self.cache is not None else EvaluationCache(max_fitness=0)
+        totals = [0.0] * len(genomes)
+        active = list(range(len(genomes)))
+        self.last_stats = {'survivors': []}
+
+        for stage, (courses, max_frames) in enumerate(self.stages):
+            # Everyone in a stage plays the same courses
+            seeds = [draw_seed(self._rng) for _ in range(courses)]
+            players = [genomes[i][1] for i in active]
+            sums = [0.0] * len(active)
+            for seed in seeds:
+                fitness = _play(cache, players, config, seed, max_frames, self.last_stats,
+                                self.shaping, self.action_repeat)
+                sums = [a + b for a, b in zip(sums, fitness)]
+            for i, total in zip(active, sums):
+                totals[i] += total / courses
+            self.last_stats['survivors'].append(len(active))
+
+            if stage == len(self.stages) - 1:
+                break
+            keep = max(self.min_keep, math.ceil(len(active) * self.keep_fraction))
+            active = sorted(active, key=lambda i: totals[i], reverse=True)[:keep]
+
+        for (_, genome), total in zip(genomes, totals):
+            genome.fitness = total
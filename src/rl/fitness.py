@@ -0,0 +1,123 @@
+"""Fitness shaping for the training loops.
+
+A shaping turns one frame of the game into a fitness increment for every
+bird at once. It gets NumPy arrays over all birds of a population:
+
+    alive         bool mask of birds still flying this frame
+    gap_distance  vertical distance from each bird to the next gap's center,
+                  or None when no pipe is ahead
+    passed        pipes passed so far by each bird (0 for dead birds)
+
+and returns the per-bird increments. The shaping is picked in the
+[FitnessShaping] section of the NEAT config:
+
+    [FitnessShaping]
+    shaping       = default
+    center_bonus  = 0.05
+
+The other keys in the section are parameters. Each shaping takes the
+ones it knows and ignores the rest.
+"""
+import configparser
+import inspect
+from abc import ABC, abstractmethod
+import numpy as np
+from src.utils.constants import WINDOW_HEIGHT, PIPE_GAP
+
+SECTION = 'FitnessShaping'
+
+
+def gap_center_ahead(pipes, x):
+    """Center of the next gap for birds at x, as eval_genomes has always measured it"""
+    nearest_pipe = min((p for p in pipes if p.rect.right > x),
+                       key=lambda p: p.rect.x - x,
+                       default=None)
+    if nearest_pipe is None:
+        return None
+    return nearest_pipe.rect.bottom + PIPE_GAP/2
+
+
+class FitnessShaping(ABC):
+    name = None
+
+    def __init__(self, **params):
+        self.params = params
+
+    def spec(self) -> dict:
+        """JSON-friendly description, rebuilt with shaping_from_spec"""
+        return {'shaping': self.name, **self.params}
+
+    def key(self):
+        """Hashable identity, used to keep cached fitness apart per shaping"""
+        return (self.name,) + tuple(sorted(self.params.items()))
+
+    @abstractmethod
+    def __call__(self, alive, gap_distance, passed):
+        """Per-bird fitness increments for one frame"""
+
+
+class DefaultShaping(FitnessShaping):
+    """The original reward: time alive, closeness to the gap center and score"""
+    name = 'default'
+
+    def __init__(self, survival_reward=0.1, center_bonus=0.05, score_reward=10.0):
+        super().__init__(survival_reward=survival_reward, center_bonus=center_bonus,
+                         score_reward=score_reward)
+        self.survival_reward = survival_reward
+        self.center_bonus = center_bonus
+        self.score_reward = score_reward
+
+    def __call__(self, alive, gap_distance, passed):
+        increment = np.full(len(alive), self.survival_reward)
+        if gap_distance is not None:
+            increment += (1 - gap_distance/WINDOW_HEIGHT) * self.center_bonus
+        # Every frame pays out the score so far, so early passes count the most
+        increment += passed * self.score_reward
+        return np.where(alive, increment, 0.0)
+
+
+class SurvivalShaping(FitnessShaping):
+    """Only time alive and pipes passed, without the gap-center hint"""
+    name = 'survival'
+
+    def __init__(self, survival_reward=0.1, score_reward=10.0):
+        super().__init__(survival_reward=survival_reward, score_reward=score_reward)
+        self.survival_reward = survival_reward
+        self.score_reward = score_reward
+
+    def __call__(self, alive, gap_distance, passed):
+        return np.where(alive, self.survival_reward + passed * self.score_reward, 0.0)
+
+
+SHAPINGS = {cls.name: cls for cls in (DefaultShaping, SurvivalShaping)}
+
+
+def _parameters(cls):
+    return set(inspect.signature(cls.__init__).parameters) - {'self'}
+
+
+def shaping_from_spec(spec=None) -> FitnessShaping:
+    """Build a shaping from a dict like {'shaping': 'default', 'center_bonus': 0.05}.
+
+    Parameters of the other shapings are ignored, so switching shapings in a
+    config does not mean deleting the old one's settings.
+    """
+    params = dict(spec or {})
+    name = params.pop('shaping', DefaultShaping.name)
+    if name not in SHAPINGS:
+        raise ValueError(f"Unknown fitness shaping: {name} (choose from {', '.join(SHAPINGS)})")
+    known = set().union(*(_parameters(cls) for cls in SHAPINGS.values()))
+    unknown = sorted(set(params) - known)
+    if unknown:
+        raise ValueError(f"Unknown fitness shaping parameter: {', '.join(unknown)}")
+    accepted = _parameters(SHAPINGS[name])
+    return SHAPINGS[name](**{k: float(v) for k, v in params.items() if k in accepted})
+
+
+def load_shaping(config_path: str) -> FitnessShaping:
+    """Shaping from the config's [FitnessShaping] section, the default if it has none"""
+    parser = configparser.ConfigParser(inline_comment_prefixes=('#',))
+    parser.read(config_path)
+    if not parser.has_section(SECTION):
+        return DefaultShaping()
+    return shaping_from_spec(dict(parser.items(SECTION)))
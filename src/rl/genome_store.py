@@ -0,0 +1,192 @@
+"""Compact struct-of-arrays storage for NEAT genomes.
+
+A neat DefaultGenome keeps every node and connection as a Python object
+with its own attribute dict. GenomeStore packs the genes of many genomes
+into a few flat NumPy arrays instead: node keys, biases, responses and
+activation/aggregation IDs, and connection endpoints, weights and enabled
+flags, with per-genome offsets into each. That takes a fraction of the
+memory and pickle size. A genome becomes a DefaultGenome again only when it
+is asked for.
+
+Genes keep each genome's dict order, so rebuilt genomes give bit-identical
+distances and networks.
+
+dump_checkpoint pickles a checkpoint with all of its genomes packed into one
+store. Genomes are packed by identity, so a checkpoint holding several
+populations (islands) whose keys overlap keeps every one of them. The file
+is still a plain pickle, so pickle.load (and policy.load_checkpoint) reads
+it back with the genomes rebuilt.
+"""
+import io
+import pickle
+import numpy as np
+import neat
+
+
+class GenomeStore:
+    def __init__(self, genomes):
+        """Pack an iterable of genomes; lookups by key need distinct keys"""
+        genomes = list(genomes)
+        first = genomes[0] if genomes else None
+        self.genome_type = type(first) if first is not None else neat.DefaultGenome
+        self.node_type = _gene_type(genomes, 'nodes', neat.genes.DefaultNodeGene)
+        self.connection_type = _gene_type(genomes, 'connections', neat.genes.DefaultConnectionGene)
+        self.keys = np.array([g.key for g in genomes], dtype=np.int64)
+        self.fitness = np.array([np.nan if g.fitness is None else g.fitness for g in genomes])
+
+        self.node_offsets = _offsets(len(g.nodes) for g in genomes)
+        nodes = [n for g in genomes for n in g.nodes.values()]
+        self.activations, self.aggregations = [], []
+        self.node_keys = np.array([n.key for n in nodes], dtype=np.int32)
+        self.node_bias = np.array([n.bias for n in nodes], dtype=np.float64)
+        self.node_response = np.array([n.response for n in nodes], dtype=np.float64)
+        self.node_activation = _names(self.activations, (n.activation for n in nodes))
+        self.node_aggregation = _names(self.aggregations, (n.aggregation for n in nodes))
+
+        self.connection_offsets = _offsets(len(g.connections) for g in genomes)
+        connections = [c for g in genomes for c in g.connections.values()]
+        self.connection_in = np.array([c.key[0] for c in connections], dtype=np.int32)
+        self.connection_out = np.array([c.key[1] for c in connections], dtype=np.int32)
+        self.connection_weight = np.array([c.weight for c in connections], dtype=np.float64)
+        self.connection_enabled = np.array([c.enabled for c in connections], dtype=bool)
+        self._index = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    @property
+    def index(self) -> dict:
+        """Genome key -> position in the store"""
+        if self._index is None:
+            self._index = {k: i for i, k in enumerate(self.keys.tolist())}
+        return self._index
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the gene arrays"""
+        return sum(v.nbytes for v in self.__dict__.values() if isinstance(v, np.ndarray))
+
+    def _nodes(self, i):
+        lo, hi = self.node_offsets[i], self.node_offsets[i + 1]
+        return zip(self.node_keys[lo:hi].tolist(), self.node_bias[lo:hi].tolist(),
+                   self.node_response[lo:hi].tolist(),
+                   [self.activations[a] for a in self.node_activation[lo:hi].tolist()],
+                   [self.aggregations[a] for a in self.node_aggregation[lo:hi].tolist()])
+
+    def _connections(self, i):
+        lo, hi = self.connection_offsets[i], self.connection_offsets[i + 1]
+        return zip(self.connection_in[lo:hi].tolist(), self.connection_out[lo:hi].tolist(),
+                   self.connection_weight[lo:hi].tolist(), self.connection_enabled[lo:hi].tolist())
+
+    def genome(self, key):
+        """Rebuild one genome as a new genome object"""
+        return self.genome_at(self.index[key])
+
+    def genome_at(self, i):
+        """Rebuild the genome at position i in the store"""
+        genome = self.genome_type(int(self.keys[i]))
+        for node_key, bias, response, activation, aggregation in self._nodes(i):
+            node = self.node_type(node_key)
+            node.bias, node.response = bias, response
+            node.activation, node.aggregation = activation, aggregation
+            genome.nodes[node_key] = node
+        for i_node, o_node, weight, enabled in self._connections(i):
+            connection = self.connection_type((i_node, o_node))
+            connection.weight, connection.enabled = weight, enabled
+            genome.connections[i_node, o_node] = connection
+        fitness = self.fitness[i]
+        genome.fitness = None if np.isnan(fitness) else float(fitness)
+        return genome
+
+    def genomes(self) -> dict:
+        """Rebuild every genome, keyed like a neat population"""
+        return {key: self.genome_at(i) for i, key in enumerate(self.keys.tolist())}
+
+
+def _offsets(counts):
+    counts = np.fromiter(counts, dtype=np.int64)
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+def _names(table, values):
+    """IDs of values, appending each new name to table"""
+    ids = {}
+    codes = [ids.setdefault(v, len(ids)) for v in values]
+    if len(ids) > 256:
+        raise ValueError("GenomeStore supports at most 256 distinct activation/aggregation names")
+    table.extend(ids)
+    return np.array(codes, dtype=np.uint8)
+
+
+def _gene_type(genomes, attr, default):
+    for genome in genomes:
+        for gene in getattr(genome, attr).values():
+            return type(gene)
+    return default
+
+
+def _collect(obj, found, seen):
+    """Gather genomes reachable through containers, populations and species sets"""
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, neat.DefaultGenome):
+        found.append(obj)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _collect(value, found, seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _collect(value, found, seen)
+    elif isinstance(obj, neat.Population):
+        _collect(obj.population, found, seen)
+        _collect(obj.species, found, seen)
+        _collect(obj.best_genome, found, seen)
+    elif isinstance(obj, neat.DefaultSpeciesSet):
+        for species in obj.species.values():
+            _collect(species.members, found, seen)
+            _collect(species.representative, found, seen)
+
+
+def _unpack_genome(store, i):
+    return store.genome_at(i)
+
+
+class _PackingPickler(pickle.Pickler):
+    def __init__(self, file, genomes):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.store = GenomeStore(genomes)
+        # By position rather than key: islands reuse keys across populations
+        self.packed = {id(g): i for i, g in enumerate(genomes)}
+
+    def reducer_override(self, obj):
+        if id(obj) in self.packed:
+            return _unpack_genome, (self.store, self.packed[id(obj)])
+        return NotImplemented
+
+
+def _dump(state, file):
+    found = []
+    _collect(state, found, set())
+    _PackingPickler(file, found).dump(state)
+
+
+def dumps_checkpoint(state) -> bytes:
+    """Pickle state with every genome it holds packed into one GenomeStore"""
+    buffer = io.BytesIO()
+    _dump(state, buffer)
+    return buffer.getvalue()
+
+
+def dump_checkpoint(state, path: str):
+    """Write dumps_checkpoint(state) to path"""
+    with open(path, 'wb') as f:
+        _dump(state, f)
@@ -0,0 +1,261 @@
+"""Headless, seeded replica of the training game.
+
+HeadlessGame follows the Bird/Pipe/FlappyGame rules frame for frame without
+pygame: the same physics and integer rect rounding, the same gap ranges and
+the same collision and scoring checks. Pipe spawning is counted in frames
+instead of wall-clock ticks and gap positions come from a seeded RNG, so a
+course seed reproduces the exact same run in any process or on any machine.
+"""
+import random
+import numpy as np
+from typing import List, Sequence
+from src.rl.policy import get_game_state
+from src.rl.fitness import DefaultShaping, gap_center_ahead
+from src.rl.course_bank import bank_course
+from src.utils.constants import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, GRAVITY, FLAP_STRENGTH, BIRD_MAX_VEL,
+    BIRD_WIDTH, BIRD_HEIGHT, PIPE_SPEED, PIPE_SPAWN_TIME, PIPE_GAP, PIPE_WIDTH,
+    STATE_PLAYING, STATE_GAME_OVER
+)
+
+# Frames between pipe spawns at the nominal frame rate
+PIPE_SPAWN_FRAMES = PIPE_SPAWN_TIME * FPS // 1000
+
+# Episodes are cut off here so a perfect genome cannot run forever
+DEFAULT_MAX_FRAMES = 10000
+
+
+def _round(value):
+    # pygame.Rect rounds float coordinates half away from zero
+    return int(value + 0.5) if value >= 0 else -int(-value + 0.5)
+
+
+class Rect:
+    """Minimal stand-in for the pygame.Rect attributes the game reads"""
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    def colliderect(self, other):
+        return (self.x < other.x + other.width and self.y < other.y + other.height and
+                self.x + self.width > other.x and self.y + self.height > other.y)
+
+
+class HeadlessBird:
+    __slots__ = ('rect', 'velocity', 'dead')
+
+    def __init__(self, x, y):
+        self.rect = Rect(x, y, BIRD_WIDTH, BIRD_HEIGHT)
+        self.velocity = 0
+        self.dead = False
+
+    def flap(self):
+        """Make the bird jump"""
+        self.velocity = FLAP_STRENGTH
+
+    def update(self):
+        """Apply gravity and move the bird"""
+        self.velocity = min(self.velocity + GRAVITY, BIRD_MAX_VEL)
+        self.rect.y = _round(self.rect.y + self.velocity)
+
+
+class HeadlessPipe:
+    __slots__ = ('rect', 'alive')
+
+    def __init__(self, x, is_top, height):
+        # Pipes always reach past the screen edge, so only the gap edge matters
+        if is_top:
+            self.rect = Rect(x, height - WINDOW_HEIGHT, PIPE_WIDTH, WINDOW_HEIGHT)
+        else:
+            self.rect = Rect(x, height, PIPE_WIDTH, WINDOW_HEIGHT)
+        self.alive = True
+
+    def update(self):
+        self.rect.x -= PIPE_SPEED
+        if self.rect.right < 0:
+            self.alive = False
+
+
+class Course:
+    """Seeded source of pipe gap centers using FlappyGame.spawn_pipes rules"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+    def next_gap_center(self):
+        reduced_gap = PIPE_GAP - 30
+        top_range = (reduced_gap + 50, WINDOW_HEIGHT // 3)
+        bottom_range = (2 * WINDOW_HEIGHT // 3, WINDOW_HEIGHT - reduced_gap - 50)
+        if self._rng.random() < 0.5:
+            min_height, max_height = top_range
+        else:
+            min_height, max_height = bottom_range
+        min_height = min(min_height, max_height - reduced_gap)
+        return self._rng.randint(min_height, max_height)
+
+
+class HeadlessGame:
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.reset_game()
+
+    def reset_game(self, seed=None):
+        """Reset the game state, optionally switching to a new course"""
+        if seed is not None:
+            self.seed = seed
+        # Read from the active course bank when it has this seed (same gaps)
+        self.course = bank_course(self.seed) or Course(self.seed)
+        self.birds: List[HeadlessBird] = []
+        self.pipes: List[HeadlessPipe] = []
+        self.score = 0
+        self.frame = 0
+        self.last_pipe = None
+        self.game_state = STATE_PLAYING
+
+    def add_bird(self):
+        """Add a new bird to the game"""
+        bird = HeadlessBird(WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2)
+        self.birds.append(bird)
+        return bird
+
+    def spawn_pipes(self):
+        if self.last_pipe is not None and self.frame - self.last_pipe <= PIPE_SPAWN_FRAMES:
+            return
+        if self.pipes and self.pipes[-1].rect.right > WINDOW_WIDTH:
+            return
+        pipe_x = WINDOW_WIDTH + 10
+        reduced_gap = PIPE_GAP - 30
+        gap_center = self.course.next_gap_center()
+        self.pipes.append(HeadlessPipe(pipe_x, True, gap_center - reduced_gap // 2))
+        self.pipes.append(HeadlessPipe(pipe_x, False, gap_center + reduced_gap // 2))
+        self.last_pipe = self.frame
+
+    def check_collisions(self, bird):
+        """Check collisions for a specific bird"""
+        if bird.rect.top <= 0 or bird.rect.bottom >= WINDOW_HEIGHT:
+            return True
+        return any(bird.rect.colliderect(pipe.rect) for pipe in self.pipes)
+
+    def update(self):
+        if self.game_state != STATE_PLAYING:
+            return
+        for bird in self.birds:
+            bird.update()
+        for pipe in self.pipes:
+            pipe.update()
+        self.pipes = [pipe for pipe in self.pipes if pipe.alive]
+        self.spawn_pipes()
+
+        for bird in self.birds:
+            if self.check_collisions(bird):
+                bird.dead = True
+        self.birds = [bird for bird in self.birds if not bird.dead]
+
+        # Birds share x, so a pair scores once if anyone survived this frame
+        if self.birds:
+            left = self.birds[0].rect.left
+            for bottom_pipe in self.pipes[1::2]:
+                if left - PIPE_SPEED < bottom_pipe.rect.right < left:
+                    self.score += 1
+        else:
+            self.game_state = STATE_GAME_OVER
+        self.frame += 1
+
+
+def evaluate_policies(policies: Sequence, seed: int, max_frames: int = DEFAULT_MAX_FRAMES,
+                      return_scores: bool = False, stats: dict = None, shaping=None,
+                      action_repeat: int = 1, backend: str = None):
+    """Score policies on one course with the same shaping as eval_genomes.
+
+    Each policy only needs an ``activate(state)`` method. A bird's fitness
+    does not depend on the other birds, so any split of a population over
+    several calls with the same seed gives the same results. ``shaping`` is
+    a src.rl.fitness shaping (the default one if omitted). Policies are
+    queried every ``action_repeat`` frames and their action is held in
+    between. With ``return_scores`` the pipes each bird passed are returned
+    as well. If a ``stats`` dict is given, simulated 'frames', 'bird_steps'
+    and network 'activations' are added to it. ``backend`` picks a
+    src.rl.physics backend; by default FLAPPY_PHYSICS names it, and without
+    that this loop is used.
+    """
+    from src.rl.physics import select_backend, evaluate_batched
+
+    backend = select_backend(backend, len(policies))
+    if backend != 'python':
+        return evaluate_batched(policies, seed, max_frames, return_scores, stats, shaping,
+                                action_repeat, backend)
+    if shaping is None:
+        shaping = DefaultShaping()
+    game = HeadlessGame(seed)
+    birds = [game.add_bird() for _ in policies]
+    fitness = np.zeros(len(policies))
+    flapping = [False] * len(policies)
+    scores = np.zeros(len(policies), dtype=int)
+    alive = np.ones(len(policies), dtype=bool)
+    ys = np.zeros(len(policies))
+
+    activations = 0
+
+    while game.birds and game.frame < max_frames:
+        decide = game.frame % action_repeat == 0
+        for i, bird in enumerate(birds):
+            if bird.dead:
+                alive[i] = False
+                continue
+
+            if decide:
+                state = get_game_state(bird, game.pipes)
+                flapping[i] = policies[i].activate(state)[0] > 0.5
+                activations += 1
+            if flapping[i]:
+                bird.flap()
+            ys[i] = bird.rect.y
+
+        center = gap_center_ahead(game.pipes, birds[0].rect.x)
+        gap_distance = None if center is None else np.abs(ys - center)
+        scores[alive] = game.score
+        fitness += shaping(alive, gap_distance, np.where(alive, game.score, 0))
+
+        if stats is not None:
+            stats['bird_steps'] = stats.get('bird_steps', 0) + len(game.birds)
+        game.update()
+
+    if stats is not None:
+        stats['frames'] = stats.get('frames', 0) + game.frame
+        stats['activations'] = stats.get('activations', 0) + activations
+    if return_scores:
+        return fitness.tolist(), scores.tolist()
+    return fitness.tolist()
+
+
+def eval_genomes_headless(genomes, config, seed: int, max_frames: int = DEFAULT_MAX_FRAMES,
+                          shaping=None, action_repeat: int = 1):
+    """Set ``fitness`` on (genome_id, genome) pairs using one headless course"""
+    import neat
+
+    networks = [neat.nn.FeedForwardNetwork.create(genome, config) for _, genome in genomes]
+    results = evaluate_policies(networks, seed, max_frames, shaping=shaping,
+                                action_repeat=action_repeat)
+    for (_, genome), fitness in zip(genomes, results):
+        genome.fitness = fitness
@@ -0,0 +1,230 @@
+"""Island-model training: several NEAT populations evolving side by side.
+
+Each island is a separate process with its own seed, optionally its own
+config overrides, and its own headless courses. Every
+``migration_interval`` generations the islands pause. Each one sends copies
+of its fittest genomes to the next island in a ring, where they replace
+random members of the freshly bred population. Between migrations the
+islands do not communicate at all.
+
+Usage: python -m src.rl.islands [islands] [generations]
+"""
+import os
+import random
+import sys
+import time
+import multiprocessing as mp
+from itertools import count
+from src.rl.config_variants import write_config, load_neat_config
+from src.rl.course_bank import draw_seed
+from src.rl.fitness import load_shaping
+from src.rl.genome_store import dump_checkpoint
+from src.rl.headless import DEFAULT_MAX_FRAMES, eval_genomes_headless
+from src.utils.constants import MODELS_DIR
+
+
+def _accept_immigrants(population, config, immigrants, rng):
+    """Swap random members of an unevaluated population for immigrants"""
+    if not immigrants:
+        return
+    members = list(population.population)
+    replaced = rng.sample(members, min(len(immigrants), len(members)))
+    for gid in replaced:
+        del population.population[gid]
+
+    # Node ids are drawn from a per-process counter; skip past the newcomers'
+    genome_config = config.genome_config
+    highest = max(k for g in immigrants for k in g.nodes)
+    if genome_config.node_indexer is None:
+        genome_config.node_indexer = count(highest + 1)
+    else:
+        genome_config.node_indexer = count(max(next(genome_config.node_indexer), highest + 1))
+
+    for genome in immigrants:
+        genome.key = next(population.reproduction.genome_indexer)
+        genome.fitness = None
+        population.population[genome.key] = genome
+    population.species.speciate(config, population.population, population.generation)
+
+
+def _island_main(conn, index, config_path, seed, max_frames, emigrants, state):
+    import neat
+
+    random.seed(seed)
+    config = load_neat_config(config_path)
+    shaping = load_shaping(config_path)
+    if state is not None:
+        population = neat.Population(config, state)
+        # Restoring restarts genome keys at 1; continue past the restored genomes
+        # so new children and immigrants never take the key of a living genome
+        population.reproduction.genome_indexer = count(max(population.population) + 1)
+    else:
+        population = neat.Population(config)
+    course_rng = random.Random(f"island-{index}-{seed}")
+    evaluated = {}
+
+    def evaluate(genomes, config):
+        eval_genomes_headless(genomes, config, draw_seed(course_rng), max_frames, shaping)
+        evaluated['genomes'] = [g for _, g in genomes]
+
+    while True:
+        command, payload = conn.recv()
+        if command == 'run':
+            generations, immigrants = payload
+            _accept_immigrants(population, config, immigrants, random)
+            start = time.time()
+            try:
+                population.run(evaluate, generations)
+            except neat.CompleteExtinctionException:
+                conn.send({'error': 'complete extinction'})
+                continue
+            ranked = sorted(evaluated['genomes'], key=lambda g: g.fitness, reverse=True)
+            conn.send({
+                'generation': population.generation,
+                'best_genome': population.best_genome,
+                'emigrants': ranked[:emigrants],
+                'mean_fitness': sum(g.fitness for g in ranked) / len(ranked),
+                'species': len(population.species.species),
+                'elapsed': time.time() - start,
+            })
+        elif command == 'state':
+            conn.send((population.population, population.species, population.generation))
+        elif command == 'stop':
+            break
+    conn.close()
+
+
+class IslandTrainer:
+    def __init__(self, config_path: str, num_islands=4, migration_interval=5, migrants=2,
+                 seed=0, overrides=None, max_frames=DEFAULT_MAX_FRAMES):
+        """Set up islands; ``overrides`` is an optional list of per-island config overrides"""
+        if overrides is not None and len(overrides) != num_islands:
+            raise ValueError("Need one overrides dict per island")
+        self.config_path = config_path
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.seed = seed
+        self.overrides = overrides or [None] * num_islands
+        self.max_frames = max_frames
+
+        self.best_genome = None
+        self.best_fitness = float('-inf')
+        self.best_island = None
+        self.generation = 0
+        os.makedirs(MODELS_DIR, exist_ok=True)
+
+    def _save_checkpoint(self, save_path, states):
+        dump_checkpoint({
+            'generation': self.generation,
+            'islands': states,
+            'overrides': self.overrides,
+            'best_genome': self.best_genome,
+            'best_fitness': self.best_fitness,
+            'best_island': self.best_island,
+            'timestamp': time.time()
+        }, save_path)
+
+    def _save_genome(self, save_path):
+        """Save the best genome in the same format as NEATTrainer._save_genome"""
+        dump_checkpoint({
+            'generation': self.generation,
+            'genome': self.best_genome,
+            'fitness': self.best_genome.fitness,
+            'island': self.best_island,
+            # Islands evaluate with eval_genomes_headless, which decides every frame
+            'action_repeat': 1
+        }, save_path)
+
+    def train(self, generations=100, checkpoint=None):
+        """Evolve all islands for ``generations`` generations and return the best genome.
+
+        ``checkpoint`` may be a dict saved by a previous island run to resume from.
+        """
+        states = [None] * self.num_islands
+        if checkpoint is not None:
+            states = checkpoint['islands']
+            self.generation = checkpoint['generation']
+            self.best_genome = checkpoint['best_genome']
+            self.best_fitness = checkpoint['best_fitness']
+            self.best_island = checkpoint.get('best_island')
+
+        config_paths = []
+        islands = []
+        try:
+            for i in range(self.num_islands):
+                path = write_config(self.config_path, self.overrides[i]) if self.overrides[i] else self.config_path
+                config_paths.append(path)
+                parent, child = mp.Pipe()
+                process = mp.Process(
+                    target=_island_main,
+                    args=(child, i, path, self.seed + i, self.max_frames, self.migrants, states[i]),
+                    daemon=True)
+                process.start()
+                islands.append((process, parent))
+
+            immigrants = [[] for _ in islands]
+            remaining = generations
+            while remaining > 0:
+                step = min(self.migration_interval, remaining)
+                for (_, conn), incoming in zip(islands, immigrants):
+                    conn.send(('run', (step, incoming)))
+                results = [conn.recv() for _, conn in islands]
+                remaining -= step
+                self.generation += step
+
+                print(f"\n****** Island generation {self.generation} ******")
+                for i, result in enumerate(results):
+                    if 'error' in result:
+                        print(f"Island {i}: {result['error']}")
+                        continue
+                    best = result['best_genome']
+                    print(f"Island {i}: best {best.fitness:.2f}, mean {result['mean_fitness']:.2f}, "
+                          f"{result['species']} species, {result['elapsed']:.1f}s")
+                    if best.fitness > self.best_fitness:
+                        self.best_fitness = best.fitness
+                        self.best_genome = best
+                        self.best_island = i
+                        print(f"New best fitness: {self.best_fitness} (island {i})")
+                        self._save_genome(os.path.join(MODELS_DIR, 'best_genome_current.pkl'))
+
+                # Ring migration: island i receives island i-1's fittest genomes
+                immigrants = [results[i - 1].get('emigrants', []) for i in range(len(islands))]
+
+                for _, conn in islands:
+                    conn.send(('state', None))
+                states = [conn.recv() for _, conn in islands]
+                save_path = os.path.join(MODELS_DIR, f'islands_checkpoint_gen_{self.generation}.pkl')
+                self._save_checkpoint(save_path, states)
+                print(f"Checkpoint saved: {save_path}")
+
+        except KeyboardInterrupt:
+            print("\nTraining interrupted by user")
+        finally:
+            for process, conn in islands:
+                try:
+                    conn.send(('stop', None))
+                except (OSError, BrokenPipeError):
+                    pass
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            for path in config_paths:
+                if path != self.config_path:
+                    os.remove(path)
+
+        print(f"\nBest fitness across islands: {self.best_fitness} (island {self.best_island})")
+        return self.best_genome
+
+
+def main():
+    from src.rl.policy import DEFAULT_CONFIG_PATH
+
+    num_islands = int(sys.argv[1]) if len(sys.argv) > 1 else max(1, (os.cpu_count() or 2) - 1)
+    generations = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    trainer = IslandTrainer(DEFAULT_CONFIG_PATH, num_islands=num_islands)
+    trainer.train(generations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""Array simulation backends for headless evaluation.
+
+evaluate_policies in src.rl.headless is the reference: one HeadlessBird
+object per bird, stepped in a Python loop. The backends here keep every
+bird's height, velocity and dead flag in arrays instead. Each frame one
+kernel call moves all live birds and tests them against the pipes. Pipe
+scrolling, spawning and scoring are done once per frame on the few pipe
+pairs on screen.
+
+    python  the reference loop in src.rl.headless
+    numpy   the kernel as a handful of whole-array operations
+    numba   the kernel as one compiled loop (needs numba installed)
+    auto    numba when it imports and numpy if not, but the reference loop
+            for batches smaller than MIN_ARRAY_BATCH of that backend
+
+Only moving and colliding the birds runs in the kernel. Observations,
+shaping, pipes and scoring still take about twenty small NumPy calls per
+frame however few birds are alive, and that overhead outweighs the saving
+on small batches. Measured on full episodes, numba overtakes the reference
+loop at roughly 90 birds and numpy at roughly 120; below that (including
+the default population of 50) the reference loop is the fastest.
+
+Every backend follows the Bird.update / FlappyGame.update rules exactly, so
+fitness and scores are bit-identical to the reference; check_parity runs
+them side by side. evaluate_policies also runs a short parity check the
+first time a process uses an array backend, and stays on the reference loop
+if it fails. The backend evaluate_policies uses by default is named by the
+FLAPPY_PHYSICS environment variable, so pool and island processes pick it up
+too. Without it the reference loop runs.
+
+Usage: python -m src.rl.physics [--seeds N] [--population N] [--frames N]
+"""
+import math
+import os
+import random
+import sys
+import time
+import numpy as np
+from src.rl.course_bank import bank_course
+from src.rl.fitness import DefaultShaping
+from src.rl.headless import Course, DEFAULT_MAX_FRAMES, PIPE_SPAWN_FRAMES
+from src.utils.constants import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, GRAVITY, FLAP_STRENGTH, BIRD_MAX_VEL,
+    BIRD_WIDTH, BIRD_HEIGHT, PIPE_SPEED, PIPE_GAP, PIPE_WIDTH
+)
+
+BACKEND_ENV = 'FLAPPY_PHYSICS'
+BACKENDS = ('python', 'numpy', 'numba')
+
+# Smallest batch for which 'auto' leaves the reference loop, per array backend
+MIN_ARRAY_BATCH = {'numba': 96, 'numpy': 128}
+
+BIRD_X = WINDOW_WIDTH // 4
+BIRD_Y = WINDOW_HEIGHT // 2
+PIPE_X = WINDOW_WIDTH + 10
+REDUCED_GAP = PIPE_GAP - 30
+
+_numba_kernel = None
+_warned = set()
+_verified = {}
+
+
+def step_numpy(y, v, dead, flapping, pipes):
+    """Move the live birds one frame and mark the ones that crashed.
+
+    ``pipes`` holds one (x, top pipe bottom, bottom pipe top) row per pair.
+    Returns the number of birds still alive.
+    """
+    live = np.flatnonzero(~dead)
+    vel = np.where(flapping[live], float(FLAP_STRENGTH), v[live])
+    vel = np.minimum(vel + GRAVITY, BIRD_MAX_VEL)
+    # pygame.Rect rounds half away from zero
+    moved = y[live] + vel
+    top = np.where(moved >= 0, np.floor(moved + 0.5), -np.floor(-moved + 0.5))
+    v[live] = vel
+    y[live] = top
+
+    hit = (top <= 0) | (top + BIRD_HEIGHT >= WINDOW_HEIGHT)
+    for x, gap_top, gap_bottom in pipes.tolist():
+        if BIRD_X < x + PIPE_WIDTH and BIRD_X + BIRD_WIDTH > x:
+            hit |= (top < gap_top) & (top + BIRD_HEIGHT > gap_top - WINDOW_HEIGHT)
+            hit |= (top < gap_bottom + WINDOW_HEIGHT) & (top + BIRD_HEIGHT > gap_bottom)
+    dead[live[hit]] = True
+    return len(live) - int(hit.sum())
+
+
+def _build_numba_kernel():
+    import numba
+
+    @numba.njit(cache=True)
+    def step_numba(y, v, dead, flapping, pipes):
+        live = 0
+        for i in range(y.shape[0]):
+            if dead[i]:
+                continue
+            vel = FLAP_STRENGTH if flapping[i] else v[i]
+            vel = min(vel + GRAVITY, BIRD_MAX_VEL)
+            moved = y[i] + vel
+            top = math.floor(moved + 0.5) if moved >= 0 else -math.floor(-moved + 0.5)
+            v[i] = vel
+            y[i] = top
+
+            hit = top <= 0 or top + BIRD_HEIGHT >= WINDOW_HEIGHT
+            for p in range(pipes.shape[0]):
+                x = pipes[p, 0]
+                if hit or not (BIRD_X < x + PIPE_WIDTH and BIRD_X + BIRD_WIDTH > x):
+                    continue
+                gap_top, gap_bottom = pipes[p, 1], pipes[p, 2]
+                hit = ((top < gap_top and top + BIRD_HEIGHT > gap_top - WINDOW_HEIGHT) or
+                       (top < gap_bottom + WINDOW_HEIGHT and top + BIRD_HEIGHT > gap_bottom))
+            if hit:
+                dead[i] = True
+            else:
+                live += 1
+        return live
+
+    return step_numba
+
+
+def numba_available() -> bool:
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> list:
+    return [b for b in BACKENDS if b != 'numba' or numba_available()]
+
+
+def resolve_backend(name=None, batch=None) -> str:
+    """Backend to run for name, FLAPPY_PHYSICS or the reference loop.
+
+    'auto' picks by ``batch`` size when it is given; 'auto' and an
+    unavailable 'numba' fall back to numpy.
+    """
+    name = name or os.environ.get(BACKEND_ENV) or 'python'
+    if name not in BACKENDS + ('auto',):
+        raise ValueError(f"Unknown physics backend: {name} (choose from auto, {', '.join(BACKENDS)})")
+    if name in ('auto', 'numba') and not numba_available():
+        if name == 'numba' and name not in _warned:
+            _warned.add(name)
+            print("numba is not installed, using the numpy physics backend")
+        backend = 'numpy'
+    else:
+        backend = 'numba' if name == 'auto' else name
+    if name == 'auto' and batch is not None and batch < MIN_ARRAY_BATCH[backend]:
+        return 'python'
+    return backend
+
+
+def select_backend(name=None, batch=None) -> str:
+    """resolve_backend, checking an array backend against the reference once per process"""
+    backend = resolve_backend(name, batch)
+    if backend == 'python':
+        return backend
+    if backend not in _verified:
+        mismatches = check_parity([backend], seeds=range(2), population=16,
+                                  max_frames=600, action_repeats=(1, 3), shapings=[DefaultShaping()])
+        _verified[backend] = not mismatches
+        if mismatches:
+            print(f"The {backend} physics backend does not match the reference game here; "
+                  f"using the reference loop")
+    return backend if _verified[backend] else 'python'
+
+
+def step_kernel(backend):
+    """The per-frame kernel of an array backend"""
+    global _numba_kernel
+    if backend == 'numba':
+        if _numba_kernel is None:
+            _numba_kernel = _build_numba_kernel()
+        return _numba_kernel
+    if backend == 'numpy':
+        return step_numpy
+    raise ValueError(f"{backend} is not an array physics backend")
+
+
+def observations(y, v, pipes):
+    """get_game_state for birds at heights y with velocities v, one row each"""
+    n = len(y)
+    ahead = pipes[pipes[:, 0] + PIPE_WIDTH > BIRD_X]
+    if not len(ahead):
+        return np.column_stack([np.ones(n), np.zeros(n), np.zeros(n), v / 10.0,
+                                y / WINDOW_HEIGHT, np.full(n, 0.5)])
+    x, gap_top, gap_bottom = ahead[0].tolist()
+    horizontal_distance = max(0.0, min(1.0, (x - BIRD_X) / WINDOW_WIDTH))
+    gap_center = (gap_top + (gap_bottom - gap_top)/2) / WINDOW_HEIGHT
+    gap_center = max(0.0, min(1.0, gap_center))
+    return np.column_stack([
+        np.full(n, horizontal_distance),
+        np.clip((y - gap_top) / WINDOW_HEIGHT, -1.0, 1.0),
+        np.clip((gap_bottom - y) / WINDOW_HEIGHT, -1.0, 1.0),
+        np.clip(v / 10.0, -1.0, 1.0),
+        np.clip(y / WINDOW_HEIGHT, 0.0, 1.0),
+        np.full(n, gap_center),
+    ])
+
+
+def evaluate_batched(policies, seed: int, max_frames: int = DEFAULT_MAX_FRAMES,
+                     return_scores: bool = False, stats: dict = None, shaping=None,
+                     action_repeat: int = 1, backend: str = 'auto'):
+    """evaluate_policies on an array backend; same arguments, same results"""
+    if shaping is None:
+        shaping = DefaultShaping()
+    step = step_kernel(resolve_backend(backend))
+    n = len(policies)
+    course = bank_course(seed) or Course(seed)
+    y = np.full(n, float(BIRD_Y))
+    v = np.zeros(n)
+    dead = np.zeros(n, dtype=bool)
+    flapping = np.zeros(n, dtype=bool)
+    fitness = np.zeros(n)
+    scores = np.zeros(n, dtype=int)
+    pipes = np.zeros((0, 3), dtype=np.int64)
+
+    frame = score = activations = bird_steps = 0
+    last_pipe = None
+    live = n
+    while live and frame < max_frames:
+        alive = ~dead
+        if frame % action_repeat == 0:
+            deciding = np.flatnonzero(alive)
+            states = observations(y[deciding], v[deciding], pipes).tolist()
+            for i, state in zip(deciding.tolist(), states):
+                flapping[i] = policies[i].activate(state)[0] > 0.5
+            activations += len(deciding)
+
+        ahead = pipes[pipes[:, 0] + PIPE_WIDTH > BIRD_X]
+        gap_distance = np.abs(y - (ahead[0, 1] + PIPE_GAP/2)) if len(ahead) else None
+        scores[alive] = score
+        fitness += shaping(alive, gap_distance, np.where(alive, score, 0))
+        bird_steps += live
+
+        # FlappyGame.update: pipes scroll and spawn, then birds are tested against them
+        pipes[:, 0] -= PIPE_SPEED
+        pipes = pipes[pipes[:, 0] + PIPE_WIDTH >= 0]
+        if ((last_pipe is None or frame - last_pipe > PIPE_SPAWN_FRAMES) and
+                not (len(pipes) and pipes[-1, 0] + PIPE_WIDTH > WINDOW_WIDTH)):
+            gap_center = course.next_gap_center()
+            pair = [PIPE_X, gap_center - REDUCED_GAP // 2, gap_center + REDUCED_GAP // 2]
+            pipes = np.vstack([pipes, np.array([pair], dtype=np.int64)])
+            last_pipe = frame
+        live = step(y, v, dead, flapping, pipes)
+
+        if live:
+            right = pipes[:, 0] + PIPE_WIDTH
+            score += int(((BIRD_X - PIPE_SPEED < right) & (right < BIRD_X)).sum())
+        frame += 1
+
+    if stats is not None:
+        stats['bird_steps'] = stats.get('bird_steps', 0) + bird_steps
+        stats['frames'] = stats.get('frames', 0) + frame
+        stats['activations'] = stats.get('activations', 0) + activations
+    if return_scores:
+        return fitness.tolist(), scores.tolist()
+    return fitness.tolist()
+
+
+class _LinearPolicy:
+    """Random linear policy, so parity runs cover many different flight paths"""
+
+    def __init__(self, rng):
+        self.weights = [rng.uniform(-2, 2) for _ in range(6)]
+        self.bias = rng.uniform(-1, 1)
+
+    def activate(self, state):
+        return [sum(w * s for w, s in zip(self.weights, state)) + self.bias]
+
+
+class _GapFollower:
+    """Flaps while below the gap center, which passes pipes for a long time"""
+
+    def __init__(self, margin):
+        self.margin = margin
+
+    def activate(self, state):
+        return [1.0 if state[4] - state[5] > self.margin and state[3] >= 0 else 0.0]
+
+
+def parity_policies(population, seed=0):
+    rng = random.Random(seed)
+    return [_GapFollower(rng.uniform(-0.05, 0.1)) if i % 4 == 0 else _LinearPolicy(rng)
+            for i in range(population)]
+
+
+def check_parity(backends=None, seeds=range(8), population=64, max_frames=3000,
+                 action_repeats=(1, 3), shapings=None):
+    """Run each backend against the reference loop; returns the mismatches found"""
+    from src.rl.fitness import SurvivalShaping
+    from src.rl.headless import evaluate_policies
+
+    backends = [b for b in (backends or available_backends()) if b != 'python']
+    shapings = shapings or [DefaultShaping(), SurvivalShaping()]
+    mismatches = []
+    for seed in seeds:
+        policies = parity_policies(population, seed)
+        for action_repeat in action_repeats:
+            for shaping in shapings:
+                ref_stats = {}
+                expected = evaluate_policies(policies, seed, max_frames, True, ref_stats, shaping,
+                                             action_repeat, backend='python')
+                for backend in backends:
+                    got_stats = {}
+                    got = evaluate_batched(policies, seed, max_frames, True, got_stats, shaping,
+                                           action_repeat, backend)
+                    if got != expected or got_stats != ref_stats:
+                        mismatches.append((backend, seed, action_repeat, shaping.name))
+    return mismatches
+
+
+def benchmark(backends=None, population=150, max_frames=DEFAULT_MAX_FRAMES, seed=0):
+    """Seconds per episode for each backend"""
+    from src.rl.headless import evaluate_policies
+
+    policies = parity_policies(population, seed)
+    timings = {}
+    for backend in backends or available_backends():
+        # Compile and run the first-use parity check outside the timing
+        evaluate_policies(policies[:1], seed, 10, backend=backend)
+        start = time.perf_counter()
+        evaluate_policies(policies, seed, max_frames, backend=backend)
+        timings[backend] = time.perf_counter() - start
+    return timings
+
+
+def _flag(name, default):
+    return int(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def main():
+    seeds = _flag('--seeds', 8)
+    population = _flag('--population', 64)
+    frames = _flag('--frames', 3000)
+    backends = available_backends()
+    print(f"Physics backends: {', '.join(backends)}")
+    mismatches = check_parity(backends, range(seeds), population, frames)
+    for backend, seed, action_repeat, shaping in mismatches:
+        print(f"MISMATCH {backend}: seed {seed}, action_repeat {action_repeat}, {shaping} shaping")
+    print(f"Parity: {'ok' if not mismatches else f'{len(mismatches)} mismatches'}")
+    for backend, seconds in benchmark(backends, population, frames).items():
+        print(f"{backend:>8}: {seconds:.3f}s per episode of {population} birds")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,9 @@
 import os
-import neat
 import pygame
-from src.rl.visualizer import NEATVisualizer
 from src.core.game import FlappyGame
-from src.rl.train import NEATTrainer
+from src.rl.policy import load_policy, extract_genome, action_repeat_of, get_game_state, DEFAULT_CONFIG_PATH
 from src.utils.constants import STATE_GAME_OVER, MODELS_DIR, FPS
+from src.utils.frame_timer import FrameTimer
 import sys
 
 def play_best_network():
@@ -12,75 +11,64 @@ def play_best_network():
     game = FlappyGame()
     
     # Setup paths
-    local_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    config_path = os.path.join(local_dir, 'neat_config.txt')
+    config_path = DEFAULT_CONFIG_PATH
     
     # Get model filename from command line or use default
     model_file = sys.argv[1] if len(sys.argv) > 1 else 'best_genome_current.pkl'
     genome_path = os.path.join(MODELS_DIR, model_file)
     
-    # Load and create network
-    visualizer = NEATVisualizer(config_path)
-    trainer = NEATTrainer(config_path)
-    
     try:
-        # Load the checkpoint
-        checkpoint = visualizer.load_genome(genome_path)
-        
-        # Extract the genome based on file type and format
-        if isinstance(checkpoint, dict):
-            # For score_50 saves
-            if 'genome' in checkpoint and isinstance(checkpoint['genome'], neat.genome.DefaultGenome):
-                genome = checkpoint['genome']
-            # For regular checkpoints
-            elif 'best_genome' in checkpoint:
-                genome = checkpoint['best_genome']
-            # Try to find any genome in the dictionary
-            else:
-                for key, value in checkpoint.items():
-                    if isinstance(value, neat.genome.DefaultGenome):
-                        genome = value
-                        break
-                else:
-                    print("Could not find valid genome in checkpoint")
-                    return
-        else:
-            genome = checkpoint
-            
-        network = visualizer.create_network(genome)
+        # Load the checkpoint and build its network
+        network, checkpoint = load_policy(genome_path, config_path)
+        action_repeat = action_repeat_of(checkpoint)
         clock = pygame.time.Clock()
+        frame_timer = FrameTimer()
         
         # Print initial info
         print(f"\nLoaded model: {model_file}")
         if isinstance(checkpoint, dict):
             print(f"Generation: {checkpoint.get('generation', 'unknown')}")
             print(f"Original Score: {checkpoint.get('score', 'unknown')}")
-            print(f"Fitness: {checkpoint.get('fitness', genome.fitness)}")
+            fitness = checkpoint.get('fitness')
+            if fitness is None:
+                fitness = getattr(extract_genome(checkpoint), 'fitness', 'unknown')
+            print(f"Fitness: {fitness}")
+            print(f"Action repeat: {action_repeat}")
             print("\nStarting game...\n")
         
         # Play the game
         game.reset_game()
+        frame = 0
+        flapping = False
         
         while game.game_state != STATE_GAME_OVER and len(game.birds) > 0:
-            # Get current game state
-            state = trainer.get_game_state(game.birds[0], game.pipes)
+            # Handle window close before stepping
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    print(f"\n{frame_timer.summary()}")
+                    pygame.quit()
+                    return
+            
+            frame_timer.start()
             
-            # Get network output
-            output = network.activate(state)
+            # Decide every action_repeat frames, as during training
+            if frame % action_repeat == 0:
+                # Get current game state
+                state = get_game_state(game.birds[0], game.pipes)
+                
+                # Get network output
+                output = network.activate(state)
+                flapping = output[0] > 0.5
             
-            # Decide action based on network output
-            if output[0] > 0.5:
+            # Hold the last action in between decisions
+            if flapping:
                 game.birds[0].flap()
+            frame += 1
             
             # Update and draw game
             game.update()
             game.draw()
-            
-            # Handle window close
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return
+            frame_timer.stop()
             
             # Cap framerate
             clock.tick(FPS)
@@ -90,10 +78,13 @@ def play_best_network():
                 print(f"Current Score: {game.score}", end='\r')
         
         print(f"\nFinal Score: {game.score}")
+        print(frame_timer.summary())
         
     except FileNotFoundError:
         print(f"Model file not found: {genome_path}")
         print("Please check if the file exists in the models directory")
+    except ValueError as e:
+        print(e)
     except IndexError:
         print("Game over! No birds remaining.")
     except Exception as e:
@@ -0,0 +1,141 @@
+"""Inference-only helpers for running trained genomes.
+
+Nothing in here builds a population, opens the training control panel or
+initialises pygame, so replays and evaluation workers start quickly. neat is
+only imported once a pickled genome actually has to become a network.
+"""
+import os
+import pickle
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Tuple
+from src.utils.constants import WINDOW_WIDTH, WINDOW_HEIGHT, ROOT_DIR
+
+if TYPE_CHECKING:
+    from src.entities.bird import Bird
+    from src.entities.pipe import Pipe
+
+DEFAULT_CONFIG_PATH = os.path.join(ROOT_DIR, 'neat_config.txt')
+
+
+def _default_state(bird) -> Tuple[float, float, float, float, float, float]:
+    return (
+        1.0,  # Max distance when no pipe
+        0.0,  # Neutral height diff
+        0.0,  # Neutral height diff
+        bird.velocity / 10.0,  # Normalized velocity
+        bird.rect.y / WINDOW_HEIGHT,  # Normalized bird height
+        0.5  # Center gap position when no pipe
+    )
+
+
+def get_game_state(bird: 'Bird', pipes: Iterable['Pipe']) -> Tuple[float, float, float, float, float, float]:
+    """Extract relevant game state features"""
+    if not pipes:
+        return _default_state(bird)
+
+    # Find the nearest pipe
+    pipes_ahead = [p for p in pipes if p.rect.right > bird.rect.x]
+    if not pipes_ahead:
+        return _default_state(bird)
+
+    # Get the first pipe pair (top and bottom)
+    pipe_pairs = [(pipes_ahead[i], pipes_ahead[i+1])
+                  for i in range(0, len(pipes_ahead)-1, 2)]
+    if not pipe_pairs:
+        return _default_state(bird)
+
+    # Get nearest pipe pair
+    top_pipe, bottom_pipe = pipe_pairs[0]
+
+    # Ensure correct order (top pipe should have smaller height)
+    if top_pipe.rect.bottom > bottom_pipe.rect.top:
+        top_pipe, bottom_pipe = bottom_pipe, top_pipe
+
+    # Calculate normalized inputs
+    horizontal_distance = (top_pipe.rect.x - bird.rect.x) / WINDOW_WIDTH
+    height_diff_top = (bird.rect.y - top_pipe.rect.bottom) / WINDOW_HEIGHT
+    height_diff_bottom = (bottom_pipe.rect.top - bird.rect.y) / WINDOW_HEIGHT
+    bird_velocity = bird.velocity / 10.0
+    bird_height = bird.rect.y / WINDOW_HEIGHT
+    gap_center = (top_pipe.rect.bottom + (bottom_pipe.rect.top - top_pipe.rect.bottom)/2) / WINDOW_HEIGHT
+
+    # Clip values to ensure they're in valid ranges
+    horizontal_distance = max(0.0, min(1.0, horizontal_distance))
+    height_diff_top = max(-1.0, min(1.0, height_diff_top))
+    height_diff_bottom = max(-1.0, min(1.0, height_diff_bottom))
+    bird_velocity = max(-1.0, min(1.0, bird_velocity))
+    bird_height = max(0.0, min(1.0, bird_height))
+    gap_center = max(0.0, min(1.0, gap_center))
+
+    return (horizontal_distance, height_diff_top, height_diff_bottom,
+            bird_velocity, bird_height, gap_center)
+
+
+@lru_cache(maxsize=None)
+def load_config(config_path: str = DEFAULT_CONFIG_PATH):
+    """Load (and cache) the NEAT config used to build networks"""
+    import neat
+    return neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_path
+    )
+
+
+def load_checkpoint(genome_path: str):
+    """Unpickle a saved genome or checkpoint dict"""
+    with open(genome_path, 'rb') as f:
+        return pickle.load(f)
+
+
+def extract_genome(checkpoint):
+    """Find the genome inside any of the formats the trainer saves.
+
+    Returns None if the checkpoint does not contain a genome.
+    """
+    from neat.genome import DefaultGenome
+
+    if not isinstance(checkpoint, dict):
+        return checkpoint
+    # For score_50 saves
+    if isinstance(checkpoint.get('genome'), DefaultGenome):
+        return checkpoint['genome']
+    # For regular checkpoints
+    if checkpoint.get('best_genome') is not None:
+        return checkpoint['best_genome']
+    # Try to find any genome in the dictionary
+    for value in checkpoint.values():
+        if isinstance(value, DefaultGenome):
+            return value
+    return None
+
+
+def action_repeat_of(checkpoint) -> int:
+    """Decision interval a model was trained with (1 for saves that predate it)"""
+    if isinstance(checkpoint, dict):
+        return int(checkpoint.get('action_repeat', 1))
+    return 1
+
+
+def load_policy(genome_path: str, config_path: str = DEFAULT_CONFIG_PATH):
+    """Load a saved model and return (network, checkpoint).
+
+    The network exposes ``activate(state)`` like neat's FeedForwardNetwork.
+    Compiled ``.json`` policies load without neat; their metadata dict is
+    returned as the checkpoint. Raises ValueError if the file holds no genome.
+    """
+    if genome_path.endswith('.json'):
+        from src.rl.compiled import load_compiled
+        policy = load_compiled(genome_path)
+        return policy, policy.metadata
+
+    import neat
+
+    checkpoint = load_checkpoint(genome_path)
+    genome = extract_genome(checkpoint)
+    if genome is None:
+        raise ValueError(f"Could not find valid genome in checkpoint: {genome_path}")
+    network = neat.nn.FeedForwardNetwork.create(genome, load_config(config_path))
+    return network, checkpoint
@@ -0,0 +1,193 @@
+"""Offline rendering of replays to image files.
+
+Frames are drawn with the SDL dummy video driver, so no display is needed,
+and nothing waits for the FPS clock. A genome is first played once on the
+headless replica to record its episode: the course seed, and whether the
+bird is flapping on every frame. That is fast and needs no pygame.
+Rendering replays the recording in FlappyGame with frame-timed pipes and the
+course drawn from the same seed, so any range of frames can be rendered on
+its own. With several workers each one renders its own chunk of the
+episode.
+
+Output is a directory of numbered PNGs, or an animated GIF if the output
+path ends in .gif (GIFs need Pillow).
+
+Usage: python -m src.rl.render <model.pkl|model.json|episode.pkl> [output]
+           [--stride N] [--workers N] [--seed S] [--max-frames N] [--scale F] [--record episode.pkl]
+"""
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import time
+import multiprocessing as mp
+from src.rl.headless import HeadlessGame, DEFAULT_MAX_FRAMES
+from src.rl.policy import load_policy, action_repeat_of, get_game_state, DEFAULT_CONFIG_PATH
+from src.utils.constants import MODELS_DIR, FPS, STATE_PLAYING
+
+RENDERS_DIR = os.path.join(MODELS_DIR, 'renders')
+FRAME_PATTERN = 'frame_{:06d}'
+
+
+def record_episode(policy, seed=0, action_repeat=1, max_frames=DEFAULT_MAX_FRAMES) -> dict:
+    """Play one bird headless and keep what is needed to replay it"""
+    game = HeadlessGame(seed)
+    bird = game.add_bird()
+    flaps = bytearray()
+    flapping = False
+    while game.birds and game.frame < max_frames:
+        # Decide every action_repeat frames, as during training and in play.py
+        if game.frame % action_repeat == 0:
+            flapping = policy.activate(get_game_state(bird, game.pipes))[0] > 0.5
+        if flapping:
+            bird.flap()
+        flaps.append(flapping)
+        game.update()
+    return {'seed': seed, 'action_repeat': action_repeat, 'flaps': bytes(flaps),
+            'frames': game.frame, 'score': game.score}
+
+
+def save_episode(episode: dict, path: str):
+    with open(path, 'wb') as f:
+        pickle.dump(episode, f)
+
+
+def load_episode(path: str):
+    """A recorded episode, or None if the file holds something else"""
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    if isinstance(data, dict) and 'flaps' in data:
+        return data
+    return None
+
+
+def _replay(episode):
+    """Yield (frame, game) after each frame of the episode is simulated"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from src.core.game import FlappyGame
+
+    game = FlappyGame(sound_enabled=False)
+    game.frame_clock = True
+    # FlappyGame draws gaps from the global RNG in the same order as Course(seed)
+    random.seed(episode['seed'])
+    bird = game.birds[0]
+    for frame, flap in enumerate(episode['flaps']):
+        if game.game_state != STATE_PLAYING:
+            break
+        if flap:
+            bird.flap()
+        game.update()
+        yield frame, game
+
+
+def _render_chunk(args):
+    episode, start, stop, stride, out_dir, scale, ext = args
+    import pygame
+
+    written = 0
+    try:
+        for frame, game in _replay(episode):
+            if frame >= stop:
+                break
+            if frame < start or frame % stride:
+                continue
+            game.draw()
+            surface = game.screen
+            if scale != 1.0:
+                size = (round(surface.get_width() * scale), round(surface.get_height() * scale))
+                surface = pygame.transform.smoothscale(surface, size)
+            pygame.image.save(surface, os.path.join(out_dir, FRAME_PATTERN.format(frame // stride) + ext))
+            written += 1
+        if stop >= episode['frames'] and (game.frame, game.score) != (episode['frames'], episode['score']):
+            print(f"Warning: replay ended after {game.frame} frames with score {game.score}, "
+                  f"the recording after {episode['frames']} with {episode['score']}")
+    finally:
+        pygame.quit()
+    return written
+
+
+def _chunks(frames, stride, workers):
+    """Frame ranges of about equal size, starting on multiples of stride"""
+    drawn = -(-frames // stride)
+    bounds = [drawn * i // workers * stride for i in range(workers)] + [frames]
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+
+
+def _write_gif(frame_dir, path, stride):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Writing GIFs needs Pillow (pip install Pillow); "
+                          "render to a directory of PNGs instead") from None
+    names = sorted(os.listdir(frame_dir))
+    if not names:
+        return
+    images = (Image.open(os.path.join(frame_dir, name)) for name in names[1:])
+    first = Image.open(os.path.join(frame_dir, names[0]))
+    first.save(path, save_all=True, append_images=images, loop=0,
+               duration=round(stride * 1000 / FPS))
+
+
+def render_episode(episode: dict, output: str, stride=1, workers=1, scale=1.0) -> int:
+    """Render every stride-th frame to PNGs in output, or to a .gif; returns the frame count"""
+    gif = output.lower().endswith('.gif')
+    out_dir = tempfile.mkdtemp(prefix='flappy_render_') if gif else output
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        # GIF frames only pass through the temp dir, and BMPs are far quicker to write than PNGs
+        ext = '.bmp' if gif else '.png'
+        jobs = [(episode, lo, hi, stride, out_dir, scale, ext)
+                for lo, hi in _chunks(episode['frames'], stride, max(1, workers))]
+        if len(jobs) > 1:
+            # Fresh processes, so each one starts its own pygame
+            with mp.get_context('spawn').Pool(len(jobs)) as pool:
+                written = sum(pool.map(_render_chunk, jobs))
+        else:
+            written = sum(map(_render_chunk, jobs))
+        if gif:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            _write_gif(out_dir, output, stride)
+    finally:
+        if gif:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    return written
+
+
+def _flag(name, default, cast=int):
+    return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def main():
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith('--') and not sys.argv[i - 1].startswith('--')]
+    if not args:
+        print(__doc__.strip().split('Usage: ')[-1])
+        return
+    path = args[0] if os.path.exists(args[0]) else os.path.join(MODELS_DIR, args[0])
+    name = os.path.splitext(os.path.basename(path))[0]
+    output = args[1] if len(args) > 1 else os.path.join(RENDERS_DIR, name)
+    stride = _flag('--stride', 1)
+    workers = _flag('--workers', 1)
+    scale = _flag('--scale', 1.0, float)
+
+    episode = None if path.endswith('.json') else load_episode(path)
+    if episode is None:
+        network, checkpoint = load_policy(path, DEFAULT_CONFIG_PATH)
+        episode = record_episode(network, _flag('--seed', 0), action_repeat_of(checkpoint),
+                                 _flag('--max-frames', DEFAULT_MAX_FRAMES))
+        print(f"Recorded {name}: {episode['frames']} frames, score {episode['score']}")
+    if '--record' in sys.argv:
+        save_episode(episode, _flag('--record', None, str))
+
+    start = time.time()
+    written = render_episode(episode, output, stride, workers, scale)
+    elapsed = time.time() - start
+    print(f"Rendered {written} frames to {output} in {elapsed:.1f}s "
+          f"({episode['frames'] / FPS / max(elapsed, 1e-9):.1f}x realtime)")
+
+
+if __name__ == "__main__":
+    main()
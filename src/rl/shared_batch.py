@@ -0,0 +1,237 @@
+"""Multi-process batched stepping over shared memory.
+
+SharedMemoryEvaluator splits the population into slices, one per worker
+process. Each worker runs its slice of birds on its own copy of the headless
+course. Networks stay in the trainer process, which decides every bird's
+action in one place ("central inference"). Nothing is pickled per step or
+per generation. Observations, actions, alive flags and fitness all live in
+one multiprocessing.shared_memory block that both sides index directly.
+
+Each step is handed over with semaphores. Every worker has its own "go"
+semaphore and all of them share one "done" semaphore:
+
+    trainer  writes the command and actions, then releases every go[w]
+    workers  acquire go[w], step their birds up to the next decision frame,
+             write observations / alive / fitness, then release done
+    trainer  acquires done once per worker, reads observations
+
+Semaphore release and acquire order the shared-memory writes on every
+platform, so no side reads the block while the other is still writing it.
+Between decisions (see action_repeat) the workers run on their own. Birds do
+not affect each other, so the fitness matches evaluate_policies exactly.
+"""
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from src.rl.course_bank import draw_seed
+from src.rl.headless import DEFAULT_MAX_FRAMES
+
+NUM_INPUTS = 6
+
+# Control slots, written by the trainer only
+COMMAND, SIZE, SEED, MAX_FRAMES = range(4)
+CONTROL_SLOTS = 4
+START, STEP, STOP = 1, 2, 3
+
+# Seconds between liveness checks while waiting on the other side
+POLL_INTERVAL = 1.0
+
+
+def _layout(capacity):
+    """(name, dtype, shape) of every array in the shared block, in order"""
+    return [
+        ('control', np.int64, (CONTROL_SLOTS,)),
+        ('obs', np.float64, (capacity, NUM_INPUTS)),
+        ('fitness', np.float64, (capacity,)),
+        ('actions', np.uint8, (capacity,)),
+        ('alive', np.uint8, (capacity,)),
+    ]
+
+
+def _views(buf, capacity):
+    """Numpy arrays over the shared buffer"""
+    views = {}
+    offset = 0
+    for name, dtype, shape in _layout(capacity):
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset = -(-offset // 8) * 8
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += size
+    return views
+
+
+def _block_size(capacity):
+    offset = 0
+    for _, dtype, shape in _layout(capacity):
+        offset = -(-offset // 8) * 8 + int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return offset
+
+
+def _acquire(semaphore, check):
+    """Acquire semaphore, calling check() whenever it takes a while"""
+    while not semaphore.acquire(timeout=POLL_INTERVAL):
+        check()
+
+
+def _worker_main(name, capacity, workers, index, go, done, shaping_spec, action_repeat):
+    from src.rl.fitness import shaping_from_spec, gap_center_ahead
+    from src.rl.headless import HeadlessGame
+    from src.rl.policy import get_game_state
+
+    # Children share the trainer's resource tracker, which unlinks the block on close()
+    shm = shared_memory.SharedMemory(name=name)
+    v = _views(shm.buf, capacity)
+    control = v['control']
+    shaping = shaping_from_spec(shaping_spec)
+    parent = mp.parent_process()
+
+    def check_parent():
+        if parent is not None and not parent.is_alive():
+            raise SystemExit
+
+    while True:
+        _acquire(go, check_parent)
+        command = control[COMMAND]
+        if command == STOP:
+            break
+
+        if command == START:
+            n = int(control[SIZE])
+            lo, hi = n * index // workers, n * (index + 1) // workers
+            max_frames = int(control[MAX_FRAMES])
+            game = HeadlessGame(int(control[SEED]))
+            birds = [game.add_bird() for _ in range(lo, hi)]
+            alive = np.ones(hi - lo, dtype=bool)
+            ys = np.zeros(hi - lo)
+            fitness = v['fitness'][lo:hi]
+            fitness[:] = 0.0
+        elif game.birds and game.frame < max_frames:
+            # Same frame loop as evaluate_policies, holding the decided actions
+            flapping = v['actions'][lo:hi].astype(bool)
+            for _ in range(action_repeat):
+                for i, bird in enumerate(birds):
+                    if bird.dead:
+                        alive[i] = False
+                        continue
+                    if flapping[i]:
+                        bird.flap()
+                    ys[i] = bird.rect.y
+                center = gap_center_ahead(game.pipes, birds[0].rect.x)
+                gap_distance = None if center is None else np.abs(ys - center)
+                fitness += shaping(alive, gap_distance, np.where(alive, game.score, 0))
+                game.update()
+                if not game.birds or game.frame >= max_frames:
+                    break
+
+        # Publish the next decision frame's observations
+        running = bool(game.birds) and game.frame < max_frames
+        for i, bird in enumerate(birds):
+            live = running and not bird.dead
+            v['alive'][lo + i] = live
+            if live:
+                v['obs'][lo + i] = get_game_state(bird, game.pipes)
+        done.release()
+
+
+class SharedMemoryEvaluator:
+    def __init__(self, workers=None, max_frames=DEFAULT_MAX_FRAMES, seed=None, shaping=None,
+                 action_repeat=1):
+        """Evaluate genomes with ``workers`` stepping processes and central inference.
+
+        Processes and shared memory are created on first use and sized to
+        the population; call close() when done.
+        """
+        self.workers = workers or max(1, (mp.cpu_count() or 2) - 1)
+        self.max_frames = max_frames
+        self.shaping = shaping
+        self.action_repeat = action_repeat
+        self._rng = random.Random(seed)
+        self._shm = None
+        self._processes = []
+        self._capacity = 0
+        self._go = []
+        self._done = None
+        self.last_stats = {}
+
+    def _start(self, capacity):
+        self.close()
+        self._capacity = capacity
+        self._shm = shared_memory.SharedMemory(create=True, size=_block_size(capacity))
+        self._views = _views(self._shm.buf, capacity)
+        self._views['control'][:] = 0
+        self._go = [mp.Semaphore(0) for _ in range(self.workers)]
+        self._done = mp.Semaphore(0)
+        spec = self.shaping.spec() if self.shaping else None
+        for index in range(self.workers):
+            process = mp.Process(target=_worker_main,
+                                 args=(self._shm.name, capacity, self.workers, index,
+                                       self._go[index], self._done, spec, self.action_repeat),
+                                 daemon=True)
+            process.start()
+            self._processes.append(process)
+
+    def _check_workers(self):
+        for process in self._processes:
+            if not process.is_alive():
+                raise RuntimeError(f"Stepping worker exited with code {process.exitcode}")
+
+    def _send(self, command):
+        """Publish a command and wait until every worker has handled it"""
+        self._views['control'][COMMAND] = command
+        for go in self._go:
+            go.release()
+        for _ in self._go:
+            _acquire(self._done, self._check_workers)
+
+    def evaluate(self, genomes, config):
+        """Set ``fitness`` on every (genome_id, genome) pair"""
+        import neat
+
+        n = len(genomes)
+        if n > self._capacity:
+            self._start(max(n, 2 * self._capacity))
+        networks = [neat.nn.FeedForwardNetwork.create(g, config) for _, g in genomes]
+        v = self._views
+        v['control'][SIZE] = n
+        v['control'][SEED] = draw_seed(self._rng)
+        v['control'][MAX_FRAMES] = self.max_frames
+
+        decisions = 0
+        self._send(START)
+        while True:
+            live = np.flatnonzero(v['alive'][:n])
+            if not len(live):
+                break
+            # Only the live rows leave shared memory
+            actions = v['actions']
+            for i, state in zip(live.tolist(), v['obs'][live].tolist()):
+                actions[i] = networks[i].activate(state)[0] > 0.5
+            decisions += len(live)
+            self._send(STEP)
+
+        for (_, genome), f in zip(genomes, v['fitness'][:n].tolist()):
+            genome.fitness = f
+        self.last_stats = {'activations': decisions}
+
+    def close(self):
+        """Stop the workers and free the shared block"""
+        if self._shm is None:
+            return
+        if all(p.is_alive() for p in self._processes):
+            try:
+                self._views['control'][COMMAND] = STOP
+                for go in self._go:
+                    go.release()
+            except (TypeError, ValueError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        del self._views
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._capacity = 0
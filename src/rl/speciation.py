@@ -0,0 +1,232 @@
+"""Vectorized speciation for large populations.
+
+FastSpeciesSet is a drop-in replacement for neat.DefaultSpeciesSet. It runs
+the same speciation algorithm, but genome distances come from per-genome
+gene arrays and are computed for many (representative, genome) pairs per
+NumPy call. Pairwise distances are cached by genome key across generations,
+so elites and representatives that survive are not compared again.
+
+Per-gene terms are summed sequentially in the representative's gene order,
+exactly like DefaultGenome.distance, so every distance is bit-identical and
+the species assignments are the same as neat's.
+"""
+import numpy as np
+import neat
+from neat.math_util import mean, stdev
+from neat.species import Species
+
+# Pairs expanded per NumPy call, to bound temporary memory
+CHUNK_PAIRS = 4096
+
+
+class _GeneTable:
+    """Genes of a set of genomes, concatenated in each genome's dict order"""
+
+    def __init__(self, genomes, key_width, columns):
+        counts = np.array([len(g) for g in genomes], dtype=np.int64)
+        total = int(counts.sum())
+        self.counts = counts
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        owners = np.repeat(np.arange(len(genomes), dtype=np.int64), counts)
+        # Gene keys (node ids or connection tuples) become dense ranks of the
+        # distinct keys, so any node id fits next to the owner in one int64
+        raw = np.array([k for g in genomes for k in g], dtype=np.int64).reshape(total, key_width)
+        distinct, keys = np.unique(raw, axis=0, return_inverse=True)
+        self.keys = keys.reshape(-1).astype(np.int64)
+        self.distinct = max(len(distinct), 1)
+        self.columns = [np.fromiter((fn(gene) for g in genomes for gene in g.values()), dtype=np.float64,
+                                    count=int(counts.sum())) for fn in columns]
+        combined = owners * self.distinct + self.keys
+        self.order = np.argsort(combined, kind='stable')
+        self.sorted_combined = combined[self.order]
+
+    def pair_sums(self, rep_idx, cand_idx, gene_distance):
+        """Sum of homologous gene distances (in rep order) and homologous counts"""
+        n_pairs = len(rep_idx)
+        if not len(self.keys):
+            return np.zeros(n_pairs), np.zeros(n_pairs)
+        lengths = self.counts[rep_idx]
+        pair_id = np.repeat(np.arange(n_pairs), lengths)
+        starts = np.repeat(self.offsets[rep_idx] - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        rep_gene = starts + np.arange(len(pair_id))
+
+        query = cand_idx[pair_id] * self.distinct + self.keys[rep_gene]
+        pos = np.searchsorted(self.sorted_combined, query)
+        pos = np.minimum(pos, len(self.sorted_combined) - 1)
+        found = self.sorted_combined[pos] == query
+        cand_gene = self.order[pos]
+
+        d = gene_distance([c[rep_gene] for c in self.columns], [c[cand_gene] for c in self.columns])
+        d = np.where(found, d, 0.0)
+        # bincount accumulates each bin sequentially, matching neat's loop
+        sums = np.bincount(pair_id, weights=d, minlength=n_pairs)
+        common = np.bincount(pair_id, weights=found, minlength=n_pairs)
+        return sums, common
+
+
+class FastSpeciesSet(neat.DefaultSpeciesSet):
+    """DefaultSpeciesSet with cached, vectorized compatibility distances"""
+
+    def __init__(self, config, reporters):
+        super().__init__(config, reporters)
+        self._distance_cache = {}
+
+    def __getstate__(self):
+        # Caches and gene tables are rebuilt on demand and would only bloat checkpoints
+        state = self.__dict__.copy()
+        state['_distance_cache'] = {}
+        for name in ('_index', '_nodes', '_connections'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._distance_cache = state.get('_distance_cache', {})
+
+    def _build_tables(self, genomes, genome_config):
+        activation_ids, aggregation_ids = {}, {}
+        self._index = {g.key: i for i, g in enumerate(genomes)}
+        self._nodes = _GeneTable(
+            [g.nodes for g in genomes], 1,
+            [lambda n: n.bias, lambda n: n.response,
+             lambda n: activation_ids.setdefault(n.activation, len(activation_ids)),
+             lambda n: aggregation_ids.setdefault(n.aggregation, len(aggregation_ids))])
+        self._connections = _GeneTable(
+            [g.connections for g in genomes], 2,
+            [lambda c: c.weight, lambda c: float(c.enabled)])
+        self._weight_coefficient = genome_config.compatibility_weight_coefficient
+        self._disjoint_coefficient = genome_config.compatibility_disjoint_coefficient
+
+    def _node_distance(self, a, b):
+        d = np.abs(a[0] - b[0]) + np.abs(a[1] - b[1])
+        d = d + (a[2] != b[2])
+        d = d + (a[3] != b[3])
+        return d * self._weight_coefficient
+
+    def _connection_distance(self, a, b):
+        d = np.abs(a[0] - b[0])
+        d = d + (a[1] != b[1])
+        return d * self._weight_coefficient
+
+    def _component(self, table, rep_idx, cand_idx, gene_distance):
+        sums, common = table.pair_sums(rep_idx, cand_idx, gene_distance)
+        n0, n1 = table.counts[rep_idx], table.counts[cand_idx]
+        disjoint = n0 + n1 - 2 * common.astype(np.int64)
+        largest = np.maximum(n0, n1)
+        safe = np.where(largest > 0, largest, 1)
+        return np.where(largest > 0, (sums + self._disjoint_coefficient * disjoint) / safe, 0.0)
+
+    def _compute(self, pairs, distances):
+        """Fill ``distances`` for (rep key, genome key) pairs.
+
+        ``distances`` is keyed by unordered pair and, like neat's
+        GenomeDistanceCache, keeps whichever orientation was computed first.
+        The cross-generation cache is keyed by ordered pair because the
+        summation order follows the first genome's genes.
+        """
+        missing = []
+        for a, b in pairs:
+            key = (a, b) if a <= b else (b, a)
+            if key in distances:
+                continue
+            d = self._distance_cache.get((a, b))
+            if d is None:
+                missing.append((a, b))
+                distances[key] = None
+            else:
+                distances[key] = d
+
+        for start in range(0, len(missing), CHUNK_PAIRS):
+            chunk = missing[start:start + CHUNK_PAIRS]
+            rep_idx = np.array([self._index[a] for a, _ in chunk], dtype=np.int64)
+            cand_idx = np.array([self._index[b] for _, b in chunk], dtype=np.int64)
+            result = (self._component(self._nodes, rep_idx, cand_idx, self._node_distance) +
+                      self._component(self._connections, rep_idx, cand_idx, self._connection_distance))
+            for (a, b), d in zip(chunk, result.tolist()):
+                self._distance_cache[a, b] = d
+                distances[(a, b) if a <= b else (b, a)] = d
+
+    @staticmethod
+    def _lookup(distances, a, b):
+        return distances[(a, b) if a <= b else (b, a)]
+
+    def speciate(self, config, population, generation):
+        """Place genomes into species by genetic similarity (see DefaultSpeciesSet)"""
+        assert isinstance(population, dict)
+
+        compatibility_threshold = self.species_set_config.compatibility_threshold
+
+        genomes = {g.key: g for g in population.values()}
+        for s in self.species.values():
+            genomes.setdefault(s.representative.key, s.representative)
+        self._build_tables(list(genomes.values()), config.genome_config)
+        distances = {}
+
+        # Find the best representatives for each existing species.
+        unspeciated = set(population)
+        new_representatives = {}
+        new_members = {}
+        for sid, s in self.species.items():
+            candidates = list(unspeciated)
+            rkey = s.representative.key
+            self._compute([(rkey, gid) for gid in candidates], distances)
+            dists = [self._lookup(distances, rkey, gid) for gid in candidates]
+
+            # The new representative is the genome closest to the current representative.
+            new_rid = candidates[int(np.argmin(dists))]
+            new_representatives[sid] = new_rid
+            new_members[sid] = [new_rid]
+            unspeciated.remove(new_rid)
+
+        # Compare every remaining genome with the representatives found so far in one pass.
+        self._compute([(rid, gid) for rid in new_representatives.values() for gid in unspeciated],
+                      distances)
+
+        # Partition population into species based on genetic similarity.
+        while unspeciated:
+            gid = unspeciated.pop()
+            self._compute([(rid, gid) for rid in new_representatives.values()], distances)
+
+            # Find the species with the most similar representative.
+            candidates = []
+            for sid, rid in new_representatives.items():
+                d = self._lookup(distances, rid, gid)
+                if d < compatibility_threshold:
+                    candidates.append((d, sid))
+
+            if candidates:
+                ignored_sdist, sid = min(candidates, key=lambda x: x[0])
+                new_members[sid].append(gid)
+            else:
+                # No species is similar enough, create a new species, using
+                # this genome as its representative.
+                sid = next(self.indexer)
+                new_representatives[sid] = gid
+                new_members[sid] = [gid]
+
+        # Update species collection based on new speciation.
+        self.genome_to_species = {}
+        for sid, rid in new_representatives.items():
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+
+            members = new_members[sid]
+            for gid in members:
+                self.genome_to_species[gid] = sid
+
+            member_dict = dict((gid, population[gid]) for gid in members)
+            s.update(population[rid], member_dict)
+
+        # Only pairs between genomes that can appear again are worth keeping
+        alive = set(population)
+        self._distance_cache = {k: d for k, d in self._distance_cache.items()
+                                if k[0] in alive and k[1] in alive}
+
+        # neat's cache holds both orientations of each pair, so weight them the same way
+        values = [d for (a, b), d in distances.items() for _ in range(1 if a == b else 2)]
+        gdmean = mean(values)
+        gdstdev = stdev(values)
+        self.reporters.info(
+            'Mean genetic distance {0:.3f}, standard deviation {1:.3f}'.format(gdmean, gdstdev))
@@ -0,0 +1,207 @@
+"""Streaming per-generation training statistics.
+
+StatsLogReporter replaces neat.StatisticsReporter, which keeps every
+generation's best genome and species fitness in memory and is lost when
+training ends. It writes one summary row per generation to a log directory
+and holds only the rows since its last flush.
+
+A log is a directory with a ``columns.json`` schema and one append-only
+file of little-endian float64 values per column (``<column>.f64``). A
+column can be read without touching the others. Rows only count once every
+column holds them, so a reader never sees a half-written generation.
+
+Usage: python -m src.rl.stats_log <log_dir> [--follow]
+"""
+import json
+import os
+import sys
+import time
+import numpy as np
+import neat
+
+COLUMNS = (
+    'generation', 'timestamp', 'eval_seconds', 'generation_seconds', 'population',
+    'fitness_min', 'fitness_p25', 'fitness_median', 'fitness_p75', 'fitness_max',
+    'fitness_mean', 'fitness_std', 'best_fitness',
+    'species', 'species_size_min', 'species_size_mean', 'species_size_max',
+    'nodes_mean', 'connections_mean', 'best_nodes', 'best_connections',
+)
+SCHEMA_FILE = 'columns.json'
+DTYPE = np.dtype('<f8')
+
+
+class StatsLogReporter(neat.reporting.BaseReporter):
+    def __init__(self, log_dir: str, flush_interval=10.0):
+        """Append generation summaries to log_dir, flushing at most every flush_interval seconds"""
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.best_fitness = float('-inf')
+        self._files = None
+        self._pending = []
+        self._row = None
+        self._generation_start = None
+        self._last_flush = time.time()
+
+    def __getstate__(self):
+        # Checkpoints pickle the population and its reporters; file handles can't go along
+        self.flush()
+        state = self.__dict__.copy()
+        state['_files'] = None
+        state['_row'] = None
+        return state
+
+    def _open(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        schema_path = os.path.join(self.log_dir, SCHEMA_FILE)
+        if not os.path.exists(schema_path):
+            with open(schema_path, 'w') as f:
+                json.dump({'columns': list(COLUMNS), 'dtype': DTYPE.str}, f)
+        # Line up the columns again if an earlier run died halfway through a flush
+        rows = _complete_rows(self.log_dir, COLUMNS)
+        self._files = {}
+        for column in COLUMNS:
+            path = os.path.join(self.log_dir, f'{column}.f64')
+            f = open(path, 'ab')
+            f.truncate(rows * DTYPE.itemsize)
+            self._files[column] = f
+
+    def flush(self):
+        """Write buffered rows to disk"""
+        self._last_flush = time.time()
+        if not self._pending:
+            return
+        if self._files is None:
+            self._open()
+        values = np.array([[row[c] for c in COLUMNS] for row in self._pending], dtype=DTYPE)
+        for i, column in enumerate(COLUMNS):
+            f = self._files[column]
+            f.write(values[:, i].tobytes())
+            f.flush()
+        self._pending = []
+
+    def close(self):
+        """Flush and release the column files"""
+        self.flush()
+        for f in (self._files or {}).values():
+            f.close()
+        self._files = None
+
+    def start_generation(self, generation):
+        self._generation_start = time.time()
+        self._row = {'generation': generation}
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self._row is None:
+            return
+        fitness = np.array([g.fitness for g in population.values()], dtype=float)
+        sizes = np.array([g.size() for g in population.values()], dtype=float)
+        species_sizes = np.array([len(s.members) for s in species.species.values()] or [0])
+        self.best_fitness = max(self.best_fitness, best_genome.fitness)
+        p25, median, p75 = np.percentile(fitness, [25, 50, 75])
+        best_nodes, best_connections = best_genome.size()
+        self._row.update({
+            'timestamp': time.time(),
+            'eval_seconds': time.time() - self._generation_start,
+            'population': len(fitness),
+            'fitness_min': fitness.min(),
+            'fitness_p25': p25,
+            'fitness_median': median,
+            'fitness_p75': p75,
+            'fitness_max': fitness.max(),
+            'fitness_mean': fitness.mean(),
+            'fitness_std': fitness.std(),
+            'best_fitness': self.best_fitness,
+            'species': len(species.species),
+            'species_size_min': species_sizes.min(),
+            'species_size_mean': species_sizes.mean(),
+            'species_size_max': species_sizes.max(),
+            'nodes_mean': sizes[:, 0].mean(),
+            'connections_mean': sizes[:, 1].mean(),
+            'best_nodes': best_nodes,
+            'best_connections': best_connections,
+        })
+
+    def _finish_row(self):
+        if self._row is None or 'timestamp' not in self._row:
+            return
+        self._row['generation_seconds'] = time.time() - self._generation_start
+        self._pending.append(self._row)
+        self._row = None
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def end_generation(self, config, population, species_set):
+        self._finish_row()
+
+    def found_solution(self, config, generation, best):
+        self._finish_row()
+        self.flush()
+
+    def complete_extinction(self):
+        self._finish_row()
+        self.flush()
+
+
+def _complete_rows(log_dir, columns):
+    sizes = []
+    for column in columns:
+        path = os.path.join(log_dir, f'{column}.f64')
+        sizes.append(os.path.getsize(path) // DTYPE.itemsize if os.path.exists(path) else 0)
+    return min(sizes)
+
+
+def read_columns(log_dir: str) -> list:
+    """Column names stored in a log"""
+    with open(os.path.join(log_dir, SCHEMA_FILE)) as f:
+        return json.load(f)['columns']
+
+
+def read_stats(log_dir: str, columns=None, start=0) -> dict:
+    """Complete rows from ``start`` on, as one array per column"""
+    columns = list(columns or read_columns(log_dir))
+    rows = _complete_rows(log_dir, columns)
+    data = {}
+    for column in columns:
+        with open(os.path.join(log_dir, f'{column}.f64'), 'rb') as f:
+            f.seek(start * DTYPE.itemsize)
+            data[column] = np.fromfile(f, dtype=DTYPE, count=max(0, rows - start))
+    return data
+
+
+def tail_stats(log_dir: str, start=0, follow=True, poll_interval=1.0):
+    """Yield rows as dicts, waiting for new ones while ``follow`` is set"""
+    while not os.path.exists(os.path.join(log_dir, SCHEMA_FILE)):
+        if not follow:
+            return
+        time.sleep(poll_interval)
+    columns = read_columns(log_dir)
+    position = start
+    while True:
+        data = read_stats(log_dir, columns, position)
+        count = len(data[columns[0]])
+        for i in range(count):
+            yield {c: data[c][i].item() for c in columns}
+        position += count
+        if not follow:
+            return
+        if not count:
+            time.sleep(poll_interval)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        return
+    follow = '--follow' in sys.argv
+    shown = ('generation', 'fitness_max', 'fitness_median', 'best_fitness', 'species',
+             'nodes_mean', 'connections_mean', 'generation_seconds')
+    print(' '.join(f'{c:>18}' for c in shown))
+    try:
+        for row in tail_stats(sys.argv[1], follow=follow):
+            print(' '.join(f'{row[c]:>18.2f}' for c in shown), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
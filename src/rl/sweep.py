@@ -0,0 +1,180 @@
+"""Parallel hyperparameter sweeps over neat_config.txt variants.
+
+The search space is a JSON object mapping config keys (see
+src.rl.config_variants) to a list of values, or, for random search only, to
+{"low": a, "high": b} (add "log": true for log-uniform sampling). Each
+variant is written to a temporary config file and trained headless in a
+process pool, up to a fixed generation and wall-time budget per run. The
+results are collected into a single CSV table.
+
+Usage: python -m src.rl.sweep <space.json> [--random N] [--repeats R]
+           [--generations G] [--max-seconds S] [--target-score N]
+           [--workers W] [--output results.csv]
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.rl.config_variants import write_config, load_neat_config
+from src.rl.course_bank import draw_seed
+from src.rl.fitness import load_shaping
+from src.rl.headless import DEFAULT_MAX_FRAMES, evaluate_policies
+from src.utils.constants import MODELS_DIR
+
+RESULT_COLUMNS = ['job', 'seed', 'generations', 'generations_to_target', 'best_fitness',
+                  'best_score', 'wall_time', 'stopped_by']
+
+
+def grid_space(space: dict):
+    """Every combination of the listed values"""
+    keys = sorted(space)
+    for key in keys:
+        if not isinstance(space[key], list):
+            raise ValueError(f"Grid search needs a list of values for {key}")
+    for values in itertools.product(*(space[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def random_space(space: dict, samples: int, seed=0):
+    """``samples`` random draws from the space"""
+    rng = random.Random(seed)
+    for _ in range(samples):
+        params = {}
+        for key in sorted(space):
+            spec = space[key]
+            if isinstance(spec, dict):
+                low, high = spec['low'], spec['high']
+                if spec.get('log'):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                if isinstance(low, int) and isinstance(high, int):
+                    value = int(round(value))
+                params[key] = value
+            else:
+                params[key] = rng.choice(spec)
+        yield params
+
+
+def run_job(base_config: str, overrides: dict, seed: int, generations: int, max_seconds: float,
+            target_score: int, max_frames: int = DEFAULT_MAX_FRAMES) -> dict:
+    """Train one config variant headless and summarise the run"""
+    import neat
+
+    config_path = write_config(base_config, overrides)
+    try:
+        random.seed(seed)
+        config = load_neat_config(config_path)
+        shaping = load_shaping(config_path)
+        population = neat.Population(config)
+        course_rng = random.Random(f"sweep-{seed}")
+        best = {'fitness': float('-inf'), 'score': 0}
+
+        def evaluate(genomes, config):
+            networks = [neat.nn.FeedForwardNetwork.create(g, config) for _, g in genomes]
+            fitness, scores = evaluate_policies(networks, draw_seed(course_rng), max_frames,
+                                                return_scores=True, shaping=shaping)
+            for (_, genome), f in zip(genomes, fitness):
+                genome.fitness = f
+            best['fitness'] = max(best['fitness'], max(fitness))
+            best['score'] = max(best['score'], max(scores))
+
+        start = time.time()
+        generations_to_target = None
+        stopped_by = 'generations'
+        done = 0
+        while done < generations:
+            try:
+                population.run(evaluate, 1)
+            except neat.CompleteExtinctionException:
+                stopped_by = 'extinction'
+                break
+            done += 1
+            if generations_to_target is None and best['score'] >= target_score:
+                generations_to_target = done
+                stopped_by = 'target'
+                break
+            if time.time() - start >= max_seconds:
+                stopped_by = 'time'
+                break
+
+        return {
+            'seed': seed,
+            'generations': done,
+            'generations_to_target': generations_to_target,
+            'best_fitness': best['fitness'],
+            'best_score': best['score'],
+            'wall_time': round(time.time() - start, 2),
+            'stopped_by': stopped_by,
+        }
+    finally:
+        os.remove(config_path)
+
+
+def run_sweep(base_config: str, variants, repeats=1, generations=50, max_seconds=600.0,
+              target_score=10, workers=None, max_frames=DEFAULT_MAX_FRAMES, seed=0):
+    """Run every variant ``repeats`` times in a process pool and return result rows"""
+    variants = list(variants)
+    # Fail on bad keys before any process is started
+    for overrides in variants:
+        os.remove(write_config(base_config, overrides))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for job, overrides in enumerate(variants):
+            for repeat in range(repeats):
+                future = pool.submit(run_job, base_config, overrides, seed + repeat, generations,
+                                     max_seconds, target_score, max_frames)
+                futures[future] = (job, overrides)
+        for future in as_completed(futures):
+            job, overrides = futures[future]
+            row = {'job': job, **overrides, **future.result()}
+            rows.append(row)
+            print(f"Job {job} seed {row['seed']}: best score {row['best_score']}, "
+                  f"fitness {row['best_fitness']:.2f}, {row['generations']} generations "
+                  f"in {row['wall_time']}s ({row['stopped_by']})")
+    rows.sort(key=lambda r: (r['job'], r['seed']))
+    return rows
+
+
+def write_results(rows, path: str):
+    """Write result rows as CSV, parameter columns first"""
+    params = sorted({k for row in rows for k in row} - set(RESULT_COLUMNS))
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['job'] + params + RESULT_COLUMNS[1:])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    from src.rl.policy import DEFAULT_CONFIG_PATH
+
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep over neat_config.txt")
+    parser.add_argument('space', help="JSON file describing the search space")
+    parser.add_argument('--random', type=int, default=0, help="random samples (default: full grid)")
+    parser.add_argument('--repeats', type=int, default=1, help="seeds per variant")
+    parser.add_argument('--generations', type=int, default=50, help="generation budget per run")
+    parser.add_argument('--max-seconds', type=float, default=600.0, help="wall-time budget per run")
+    parser.add_argument('--target-score', type=int, default=10, help="score that ends a run early")
+    parser.add_argument('--workers', type=int, default=None, help="parallel runs (default: CPU count)")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="base NEAT config")
+    parser.add_argument('--output', default=os.path.join(MODELS_DIR, 'sweep_results.csv'))
+    args = parser.parse_args()
+
+    with open(args.space, 'r') as f:
+        space = json.load(f)
+    variants = random_space(space, args.random) if args.random else grid_space(space)
+    rows = run_sweep(args.config, variants, args.repeats, args.generations, args.max_seconds,
+                     args.target_score, args.workers)
+    write_results(rows, args.output)
+    print(f"\nResults written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,39 @@
 import os
 import neat
 import pickle
-import pygame
-import tkinter as tk
-from tkinter import messagebox
-from typing import List, Tuple
 import numpy as np
-from src.entities.bird import Bird
-from src.entities.pipe import Pipe
-from src.utils.constants import STATE_GAME_OVER, PIPE_GAP, WINDOW_WIDTH, WINDOW_HEIGHT, FPS, MODELS_DIR
+from typing import TYPE_CHECKING, List, Tuple
+from src.rl.policy import get_game_state
+from src.rl.speciation import FastSpeciesSet
+from src.rl.cache import EvaluationCache, CacheReporter
+from src.rl.fitness import load_shaping, gap_center_ahead
+from src.rl.stats_log import StatsLogReporter
+from src.rl.config_variants import write_config
+from src.rl.genome_store import dump_checkpoint
+from src.utils.constants import FPS, MODELS_DIR
 import time
 
+if TYPE_CHECKING:
+    from src.entities.bird import Bird
+    from src.entities.pipe import Pipe
+
+# Render modes for NEATTrainer.train: every frame at FPS, every fast_forward-th
+# frame, or no rendering at all. Cycled with the T key or the control panel.
+RENDER_WATCH, RENDER_FAST, RENDER_TURBO = 'watch', 'fast', 'turbo'
+RENDER_MODES = (RENDER_WATCH, RENDER_FAST, RENDER_TURBO)
+
 class TrainingControlPanel:
     def __init__(self, trainer):
         self.trainer = trainer
         self.should_stop = False
         
+        # tkinter is only needed once a control window is actually opened
+        import tkinter as tk
+        
         # Create control window
         self.root = tk.Tk()
         self.root.title("Training Control Panel")
-        self.root.geometry("300x200")
+        self.root.geometry("300x250")
         
         # Add controls
         self.generation_label = tk.Label(self.root, text="Generation: 0")
@@ -28,6 +42,10 @@ class TrainingControlPanel:
         self.fitness_label = tk.Label(self.root, text="Best Fitness: 0")
         self.fitness_label.pack(pady=10)
         
+        self.mode_button = tk.Button(self.root, text=f"Mode: {trainer.render_mode}",
+                                     command=trainer.cycle_render_mode)
+        self.mode_button.pack(pady=5)
+        
         self.stop_button = tk.Button(self.root, text="Stop Training", command=self.stop_training)
         self.stop_button.pack(pady=20)
         
@@ -38,25 +56,40 @@ class TrainingControlPanel:
         self.should_stop = True
         # Save the current state when stopping
         save_path = os.path.join(MODELS_DIR, f'stopped_at_gen_{self.trainer.population.generation}.pkl')
-        with open(save_path, 'wb') as f:
-            pickle.dump({
-                'generation': self.trainer.population.generation,
-                'population': self.trainer.population,
-                'species': self.trainer.population.species,
-                'best_genome': self.trainer.best_genome,
-                'best_fitness': self.trainer.best_fitness,
-                'timestamp': time.time()
-            }, f)
+        dump_checkpoint({
+            'generation': self.trainer.population.generation,
+            'population': self.trainer.population,
+            'species': self.trainer.population.species,
+            'best_genome': self.trainer.best_genome,
+            'best_fitness': self.trainer.best_fitness,
+            'timestamp': time.time()
+        }, save_path)
+        from tkinter import messagebox
         messagebox.showinfo("Training", f"Training will stop after current generation completes.\nModel saved as: {save_path}")
     
     def update(self, generation, fitness):
         self.generation_label.config(text=f"Generation: {generation}")
         self.fitness_label.config(text=f"Best Fitness: {fitness:.2f}")
         self.root.update()
+    
+    def poll(self):
+        """Process pending clicks without touching the labels"""
+        self.mode_button.config(text=f"Mode: {self.trainer.render_mode}")
+        self.root.update()
 
 class NEATTrainer:
-    def __init__(self, config_path: str):
-        """Initialize the NEAT trainer"""
+    def __init__(self, config_path: str, control_panel: bool = True, action_repeat: int = 1):
+        """Initialize the NEAT trainer.
+
+        Networks are queried every ``action_repeat`` frames and their action
+        is held in between.
+        """
+        if action_repeat < 1:
+            raise ValueError("action_repeat must be at least 1")
+        self.action_repeat = action_repeat
+        self.render_mode = RENDER_WATCH
+        self.fast_forward = 8
+        self.TURBO_POLL_FRAMES = 100
         try:
             self.config = neat.Config(
                 neat.DefaultGenome,
@@ -69,265 +102,249 @@ class NEATTrainer:
             print("Error loading NEAT config:")
             print(e)
             print("\nTrying to fix common config issues...")
-            self._fix_config(config_path)
+            fixed_path = self._fix_config(config_path)
             self.config = neat.Config(
                 neat.DefaultGenome,
                 neat.DefaultReproduction,
                 neat.DefaultSpeciesSet,
                 neat.DefaultStagnation,
-                config_path
+                fixed_path
             )
         
+        # Same [DefaultSpeciesSet] settings, with cached vectorized distances
+        self.config.species_set_type = FastSpeciesSet
+        
+        # Reward per frame, chosen in the config's [FitnessShaping] section
+        self.shaping = load_shaping(config_path)
+        
         # Add reporters for statistics
         self.population = neat.Population(self.config)
         self.population.add_reporter(neat.StdOutReporter(True))
-        stats = neat.StatisticsReporter()
-        self.population.add_reporter(stats)
+        # Per-generation summaries are streamed to disk instead of kept in memory
+        self.stats = StatsLogReporter(os.path.join(MODELS_DIR, 'stats', time.strftime('run_%Y%m%d_%H%M%S')))
+        self.population.add_reporter(self.stats)
+        
+        # Elites come back unchanged, so their networks (and fitness) can be reused
+        self.cache = EvaluationCache()
+        self.population.add_reporter(CacheReporter(self.cache))
         
         # Track best genome across all generations
         self.best_genome = None
         self.best_fitness = float('-inf')
         
-        # Add control panel
-        self.control_panel = TrainingControlPanel(self)
+        # Add control panel (headless coordinators run without a window)
+        self.control_panel = TrainingControlPanel(self) if control_panel else None
         
         # Create models directory if it doesn't exist
         os.makedirs(MODELS_DIR, exist_ok=True)
         self._running = True
-        pygame.init()
         self.last_save_time = time.time()
         self.AUTOSAVE_INTERVAL = 60
 
     def _fix_config(self, config_path):
-        """Fix common config file issues"""
-        import configparser
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Fix any values with inline comments
-        for section in config.sections():
-            for key, value in config.items(section):
-                if '#' in value:
-                    clean_value = value.split('#')[0].strip()
-                    config.set(section, key, clean_value)
-        
-        # Write fixed config back to file
-        with open(config_path, 'w') as f:
-            config.write(f)
+        """Write a copy of the config with common issues fixed and return its path.
+
+        The original file is left untouched.
+        """
+        # Reading with inline comment prefixes strips any trailing comments
+        return write_config(config_path)
 
-    def get_game_state(self, bird: Bird, pipes: List[Pipe]) -> Tuple[float, float, float, float, float, float]:
+    def set_render_mode(self, mode):
+        """Switch rendering mid-generation; the simulation itself is unaffected"""
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {mode} (choose from {', '.join(RENDER_MODES)})")
+        self.render_mode = mode
+        print(f"\nRender mode: {mode}")
+
+    def cycle_render_mode(self):
+        """Advance to the next render mode"""
+        index = RENDER_MODES.index(self.render_mode)
+        self.set_render_mode(RENDER_MODES[(index + 1) % len(RENDER_MODES)])
+
+    def _handle_training_events(self, pygame):
+        """Window close and render mode hotkeys: T cycles, 1/2/3 pick a mode"""
+        hotkeys = {pygame.K_1: RENDER_WATCH, pygame.K_2: RENDER_FAST, pygame.K_3: RENDER_TURBO}
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self._running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_t:
+                    self.cycle_render_mode()
+                elif event.key in hotkeys:
+                    self.set_render_mode(hotkeys[event.key])
+        if self.control_panel:
+            self.control_panel.poll()
+
+    def get_game_state(self, bird: 'Bird', pipes: List['Pipe']) -> Tuple[float, float, float, float, float, float]:
         """Extract relevant game state features"""
-        if not pipes:
-            # Default state when no pipes are present
-            return (
-                1.0,  # Max distance when no pipe
-                0.0,  # Neutral height diff
-                0.0,  # Neutral height diff
-                bird.velocity / 10.0,  # Normalized velocity
-                bird.rect.y / WINDOW_HEIGHT,  # Normalized bird height
-                0.5  # Center gap position when no pipe
-            )
-            
-        # Find the nearest pipe
-        pipes_ahead = [p for p in pipes if p.rect.right > bird.rect.x]
-        if not pipes_ahead:
-            return (
-                1.0,
-                0.0,
-                0.0,
-                bird.velocity / 10.0,
-                bird.rect.y / WINDOW_HEIGHT,
-                0.5
-            )
-            
-        # Get the first pipe pair (top and bottom)
-        pipe_pairs = [(pipes_ahead[i], pipes_ahead[i+1]) 
-                     for i in range(0, len(pipes_ahead)-1, 2)]
-        if not pipe_pairs:
-            return (
-                1.0,
-                0.0,
-                0.0,
-                bird.velocity / 10.0,
-                bird.rect.y / WINDOW_HEIGHT,
-                0.5
-            )
-            
-        # Get nearest pipe pair
-        top_pipe, bottom_pipe = pipe_pairs[0]
-        
-        # Ensure correct order (top pipe should have smaller height)
-        if top_pipe.rect.bottom > bottom_pipe.rect.top:
-            top_pipe, bottom_pipe = bottom_pipe, top_pipe
-        
-        # Calculate normalized inputs
-        horizontal_distance = (top_pipe.rect.x - bird.rect.x) / WINDOW_WIDTH
-        height_diff_top = (bird.rect.y - top_pipe.rect.bottom) / WINDOW_HEIGHT
-        height_diff_bottom = (bottom_pipe.rect.top - bird.rect.y) / WINDOW_HEIGHT
-        bird_velocity = bird.velocity / 10.0
-        bird_height = bird.rect.y / WINDOW_HEIGHT
-        gap_center = (top_pipe.rect.bottom + (bottom_pipe.rect.top - top_pipe.rect.bottom)/2) / WINDOW_HEIGHT
-        
-        # Clip values to ensure they're in valid ranges
-        horizontal_distance = max(0.0, min(1.0, horizontal_distance))
-        height_diff_top = max(-1.0, min(1.0, height_diff_top))
-        height_diff_bottom = max(-1.0, min(1.0, height_diff_bottom))
-        bird_velocity = max(-1.0, min(1.0, bird_velocity))
-        bird_height = max(0.0, min(1.0, bird_height))
-        gap_center = max(0.0, min(1.0, gap_center))
-        
-        return (horizontal_distance, height_diff_top, height_diff_bottom, 
-                bird_velocity, bird_height, gap_center)
+        return get_game_state(bird, pipes)
 
     def eval_genomes(self, genomes, config, game_instance):
         """Evaluate all genomes simultaneously"""
+        import pygame
+        
         networks = []
         birds = []
         ge = []
         
         # Create a neural network and bird for each genome
         for genome_id, genome in genomes:
-            net = neat.nn.FeedForwardNetwork.create(genome, config)
+            net = self.cache.network(genome, config)
             networks.append(net)
             game_instance.add_bird()
             birds.append(game_instance.birds[-1])
             ge.append(genome)
             genome.fitness = 0
         
+        fitness = np.zeros(len(ge))
+        flapping = np.zeros(len(ge), dtype=bool)
+        alive = np.ones(len(ge), dtype=bool)
+        ys = np.zeros(len(ge))
         clock = pygame.time.Clock()
         active_birds = birds.copy()
+        frame = 0
         
-        while active_birds and self._running:
-            # Handle window close event
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self._running = False
-                    return
-            
-            # Process birds
-            for i, bird in enumerate(birds):
-                if bird.dead:
-                    continue
-                    
-                state = self.get_game_state(bird, game_instance.pipes)
-                output = networks[i].activate(state)
-                
-                if output[0] > 0.5:
-                    bird.flap()
+        try:
+            while active_birds and self._running:
+                # Handle window close and mode hotkeys (only now and then in turbo)
+                if self.render_mode != RENDER_TURBO or frame % self.TURBO_POLL_FRAMES == 0:
+                    self._handle_training_events(pygame)
+                    if not self._running:
+                        return
                 
-                ge[i].fitness += 0.1
+                # Process birds; actions are only re-decided every action_repeat frames
+                decide = frame % self.action_repeat == 0
+                for i, bird in enumerate(birds):
+                    if bird.dead:
+                        alive[i] = False
+                        continue
+                    
+                    if decide:
+                        state = self.get_game_state(bird, game_instance.pipes)
+                        output = networks[i].activate(state)
+                        flapping[i] = output[0] > 0.5
+                    
+                    if flapping[i]:
+                        bird.flap()
+                    ys[i] = bird.rect.y
                 
-                if game_instance.pipes:
-                    nearest_pipe = min((p for p in game_instance.pipes if p.rect.right > bird.rect.x), 
-                                     key=lambda p: p.rect.x - bird.rect.x, 
-                                     default=None)
-                    if nearest_pipe:
-                        pipe_center = nearest_pipe.rect.bottom + PIPE_GAP/2
-                        distance_to_center = abs(bird.rect.y - pipe_center)
-                        ge[i].fitness += (1 - distance_to_center/WINDOW_HEIGHT) * 0.05
+                # One vectorized fitness update for the whole population
+                center = gap_center_ahead(game_instance.pipes, birds[0].rect.x)
+                gap_distance = None if center is None else np.abs(ys - center)
+                fitness += self.shaping(alive, gap_distance, np.where(alive, game_instance.score, 0))
                 
-                if game_instance.score > 0:
-                    ge[i].fitness += game_instance.score * 10
-                    
-                    # Check if score reached 50
-                    if game_instance.score >= 50:
+                # Check if score reached 50
+                if game_instance.score >= 50:
+                    for i in np.flatnonzero(alive):
                         # Save this exceptional genome but continue training
                         save_path = os.path.join(MODELS_DIR, f'score_50_gen_{self.population.generation}.pkl')
                         with open(save_path, 'wb') as f:
                             pickle.dump({
                                 'generation': self.population.generation,
                                 'genome': ge[i],
-                                'fitness': ge[i].fitness,
+                                'fitness': float(fitness[i]),
                                 'score': game_instance.score,
+                                'action_repeat': self.action_repeat,
                                 'timestamp': time.time()
                             }, f)
                         print(f"\nScore 50 achieved! Model saved: {save_path}")
                         print("Continuing training...")
+                
+                game_instance.update()
+                
+                # Rendering never feeds back into the simulation, so the mode
+                # can change at any frame without affecting fitness
+                render = (self.render_mode == RENDER_WATCH or
+                          (self.render_mode == RENDER_FAST and frame % self.fast_forward == 0))
+                if render:
+                    game_instance.draw()
+                
+                active_birds = [bird for bird in birds if not bird.dead]
+                frame += 1
+                if render:
+                    clock.tick(FPS)
+                    pygame.display.flip()
+        finally:
+            # Fitness is accumulated in an array and handed to the genomes once
+            for genome, value in zip(ge, fitness.tolist()):
+                genome.fitness = value
+
+    def _save_checkpoint(self, save_path, **extra):
+        """Pickle the population and best genome to save_path, genes packed into arrays"""
+        state = {
+            'generation': self.population.generation,
+            'population': self.population,
+            'species': self.population.species,
+            'best_genome': self.best_genome,
+            'best_fitness': self.best_fitness,
+            'action_repeat': self.action_repeat
+        }
+        state.update(extra)
+        dump_checkpoint(state, save_path)
+
+    def _save_genome(self, save_path, genome):
+        """Pickle a single genome with what is needed to replay it"""
+        with open(save_path, 'wb') as f:
+            pickle.dump({
+                'generation': self.population.generation,
+                'genome': genome,
+                'fitness': genome.fitness,
+                'action_repeat': self.action_repeat
+            }, f)
+
+    def _after_evaluation(self, genomes, score=None):
+        """Track the best genome, save checkpoints and refresh the control panel"""
+        best_genome = max(genomes, key=lambda x: x[1].fitness)[1]
+        
+        if best_genome.fitness > self.best_fitness:
+            self.best_fitness = best_genome.fitness
+            self.best_genome = best_genome
+            print(f"\nNew best fitness: {self.best_fitness}")
+            if score is not None:
+                print(f"Current Score: {score}")
             
-            game_instance.update()
-            game_instance.draw()
-            
-            active_birds = [bird for bird in birds if not bird.dead]
-            clock.tick(FPS)
-            pygame.display.flip()
+            self._save_genome(os.path.join(MODELS_DIR, 'best_genome_current.pkl'), self.best_genome)
+        
+        if self.control_panel:
+            self.control_panel.update(self.population.generation, self.best_fitness)
+        
+        # Check if it's time for an autosave
+        current_time = time.time()
+        if current_time - self.last_save_time >= self.AUTOSAVE_INTERVAL:
+            save_path = os.path.join(MODELS_DIR, f'autosave_gen_{self.population.generation}.pkl')
+            self._save_checkpoint(save_path, timestamp=current_time)
+            print(f"\nAutosave created: {save_path}")
+            self.last_save_time = current_time
+        
+        # Regular checkpoint saving
+        if self.population.generation % 1 == 0:
+            save_path = os.path.join(MODELS_DIR, f'checkpoint_gen_{self.population.generation}.pkl')
+            self._save_checkpoint(save_path)
+            print(f"\nCheckpoint saved: {save_path}")
+        
+        if self.control_panel and self.control_panel.should_stop:
+            self._running = False
+            raise KeyboardInterrupt
 
-    def train(self, game_instance, generations=100):
-        """Train the NEAT population"""
+    def _run(self, evaluate, generations):
+        """Run the population with ``evaluate(genomes, config)`` as fitness function"""
         try:
             def eval_genomes_wrapper(genomes, config):
                 if not self._running:
                     raise KeyboardInterrupt
                     
                 try:
-                    game_instance.reset_game()
-                    self.eval_genomes(genomes, config, game_instance)
-                    
-                    best_genome = max(genomes, key=lambda x: x[1].fitness)[1]
-                    
-                    if best_genome.fitness > self.best_fitness:
-                        self.best_fitness = best_genome.fitness
-                        self.best_genome = best_genome
-                        print(f"\nNew best fitness: {self.best_fitness}")
-                        print(f"Current Score: {game_instance.score}")
-                        
-                        save_path = os.path.join(MODELS_DIR, 'best_genome_current.pkl')
-                        with open(save_path, 'wb') as f:
-                            pickle.dump(self.best_genome, f)
-                    
-                    self.control_panel.update(self.population.generation, self.best_fitness)
-                    
-                    # Check if it's time for an autosave
-                    current_time = time.time()
-                    if current_time - self.last_save_time >= self.AUTOSAVE_INTERVAL:
-                        save_path = os.path.join(MODELS_DIR, f'autosave_gen_{self.population.generation}.pkl')
-                        with open(save_path, 'wb') as f:
-                            pickle.dump({
-                                'generation': self.population.generation,
-                                'population': self.population,
-                                'species': self.population.species,
-                                'best_genome': self.best_genome,
-                                'best_fitness': self.best_fitness,
-                                'timestamp': current_time
-                            }, f)
-                        print(f"\nAutosave created: {save_path}")
-                        self.last_save_time = current_time
-                    
-                    # Regular checkpoint saving
-                    if self.population.generation % 1 == 0:
-                        save_path = os.path.join(MODELS_DIR, f'checkpoint_gen_{self.population.generation}.pkl')
-                        with open(save_path, 'wb') as f:
-                            pickle.dump({
-                                'generation': self.population.generation,
-                                'population': self.population,
-                                'species': self.population.species,
-                                'best_genome': self.best_genome,
-                                'best_fitness': self.best_fitness
-                            }, f)
-                        print(f"\nCheckpoint saved: {save_path}")
-                    
-                    if self.control_panel.should_stop:
-                        self._running = False
-                        raise KeyboardInterrupt
-                        
+                    evaluate(genomes, config)
                 except Exception as e:
                     print(f"Error in evaluation: {e}")
                     save_path = os.path.join(MODELS_DIR, f'error_checkpoint_gen_{self.population.generation}.pkl')
-                    with open(save_path, 'wb') as f:
-                        pickle.dump({
-                            'generation': self.population.generation,
-                            'population': self.population,
-                            'species': self.population.species,
-                            'best_genome': self.best_genome,
-                            'best_fitness': self.best_fitness,
-                            'error_time': time.time()
-                        }, f)
+                    self._save_checkpoint(save_path, error_time=time.time())
                     print(f"\nError checkpoint saved: {save_path}")
                     raise
             
             winner = self.population.run(eval_genomes_wrapper, generations)
             
-            with open(os.path.join(MODELS_DIR, 'best_genome_final.pkl'), 'wb') as f:
-                pickle.dump(winner, f)
+            self._save_genome(os.path.join(MODELS_DIR, 'best_genome_final.pkl'), winner)
                 
             print("\nTraining completed!")
             print(f"Final best fitness: {winner.fitness}")
@@ -338,22 +355,61 @@ class NEATTrainer:
             print(f"Saving best genome with fitness: {self.best_fitness}")
             
             save_path = os.path.join(MODELS_DIR, f'interrupted_gen_{self.population.generation}.pkl')
-            with open(save_path, 'wb') as f:
-                pickle.dump({
-                    'generation': self.population.generation,
-                    'population': self.population,
-                    'species': self.population.species,
-                    'best_genome': self.best_genome,
-                    'best_fitness': self.best_fitness
-                }, f)
+            self._save_checkpoint(save_path)
             print(f"Training state saved to: {save_path}")
             
             return self.best_genome
         
         finally:
             self._running = False
+            self.stats.close()
+            if self.control_panel:
+                try:
+                    self.control_panel.root.destroy()
+                except:
+                    pass
+
+    def train(self, game_instance, generations=100):
+        """Train the NEAT population"""
+        import pygame
+        pygame.init()
+        
+        # Pipes are timed in frames so fast and turbo modes play the same course
+        game_instance.frame_clock = True
+        print("Press T in the game window to cycle render modes (watch / fast / turbo)")
+        
+        def evaluate(genomes, config):
+            game_instance.reset_game()
+            self.eval_genomes(genomes, config, game_instance)
+            self._after_evaluation(genomes, game_instance.score)
+        
+        try:
+            return self._run(evaluate, generations)
+        finally:
             pygame.quit()
-            try:
-                self.control_panel.root.destroy()
-            except:
-                pass
\ No newline at end of file
+
+    def train_distributed(self, coordinator, generations=100):
+        """Train with fitness computed by remote workers (see src.rl.distributed).
+
+        Workers run the headless game, so no window is opened here.
+        """
+        return self.train_headless(coordinator, generations)
+
+    def train_headless(self, evaluator, generations=100):
+        """Train with any object providing ``evaluate(genomes, config)``.
+
+        See src.rl.evaluation for single-course and successive-halving evaluators.
+        Evaluators without a cache or fitness shaping of their own use the
+        trainer's, and every evaluator is given the trainer's action_repeat.
+        """
+        if getattr(evaluator, 'cache', False) is None:
+            evaluator.cache = self.cache
+        if getattr(evaluator, 'shaping', False) is None:
+            evaluator.shaping = self.shaping
+        evaluator.action_repeat = self.action_repeat
+        
+        def evaluate(genomes, config):
+            evaluator.evaluate(genomes, config)
+            self._after_evaluation(genomes)
+        
+        return self._run(evaluate, generations)
@@ -8,6 +8,9 @@ WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 FPS = 60
 
+# How long idle screens block waiting for input before checking again (ms)
+IDLE_EVENT_TIMEOUT = 250
+
 # Asset paths
 SPRITE_DIR = os.path.join(ROOT_DIR, 'src', 'sprites')
 AUDIO_DIR = os.path.join(ROOT_DIR, 'src', 'audio')
@@ -0,0 +1,33 @@
+import time
+from collections import deque
+
+
+class FrameTimer:
+    """Rolling record of per-frame work time (update + draw)"""
+
+    def __init__(self, window=3600):
+        self.samples = deque(maxlen=window)
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        if self._start is not None:
+            self.samples.append(time.perf_counter() - self._start)
+            self._start = None
+
+    def percentiles(self, points=(50, 95, 99)):
+        """Frame times in milliseconds at the given percentiles (nearest rank)"""
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {p: ordered[min(last, round(p / 100 * last))] * 1000 for p in points}
+
+    def summary(self):
+        values = self.percentiles()
+        if not values:
+            return "Frame time: no frames"
+        parts = ", ".join(f"p{p} {ms:.2f} ms" for p, ms in values.items())
+        return f"Frame time over {len(self.samples)} frames: {parts}"
@@ -11,7 +11,7 @@ def list_saved_models():
         print("No models directory found.")
         return []
         
-    models = [f for f in os.listdir(MODELS_DIR) if f.endswith('.pkl')]
+    models = [f for f in os.listdir(MODELS_DIR) if f.endswith(('.pkl', '.json'))]
     return sorted(models)
 
 def print_models_menu(models):
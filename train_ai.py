@@ -1,20 +1,58 @@
 from src.core.game import FlappyGame
 from src.rl.train import NEATTrainer
 import os
+import sys
 
 def train():
-    game = FlappyGame()
-    
     # Setup NEAT training
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, 'neat_config.txt')
-    trainer = NEATTrainer(config_path)
     
-    # Train the AI
-    winner = trainer.train(game, generations=100)
+    # Query networks every K frames and hold the action in between
+    action_repeat = 1
+    if '--action-repeat' in sys.argv:
+        action_repeat = int(sys.argv[sys.argv.index('--action-repeat') + 1])
+    
+    if '--physics' in sys.argv:
+        # Headless simulation backend (auto, numba, numpy or python), also used by worker processes;
+        # auto keeps batches under MIN_ARRAY_BATCH birds on the reference loop
+        from src.rl.physics import BACKEND_ENV, resolve_backend
+        backend = sys.argv[sys.argv.index('--physics') + 1]
+        resolve_backend(backend)
+        os.environ[BACKEND_ENV] = backend
+    
+    if '--shared' in sys.argv:
+        # Step birds in N worker processes over shared memory, deciding actions here
+        from src.rl.shared_batch import SharedMemoryEvaluator
+        workers = int(sys.argv[sys.argv.index('--shared') + 1])
+        evaluator = SharedMemoryEvaluator(workers=workers)
+        trainer = NEATTrainer(config_path, control_panel=False, action_repeat=action_repeat)
+        try:
+            winner = trainer.train_headless(evaluator, generations=100)
+        finally:
+            evaluator.close()
+    elif '--headless' in sys.argv or '--halving' in sys.argv or '--courses' in sys.argv:
+        # Train without a window; --halving spends less time on weak genomes
+        from src.rl.evaluation import HeadlessEvaluator, SuccessiveHalvingEvaluator
+        if '--halving' in sys.argv:
+            evaluator = SuccessiveHalvingEvaluator()
+        elif '--courses' in sys.argv:
+            # Cycle through N fixed courses so unchanged elites reuse their fitness
+            courses = int(sys.argv[sys.argv.index('--courses') + 1])
+            evaluator = HeadlessEvaluator(courses=courses)
+        else:
+            evaluator = HeadlessEvaluator()
+        trainer = NEATTrainer(config_path, control_panel=False, action_repeat=action_repeat)
+        winner = trainer.train_headless(evaluator, generations=100)
+    else:
+        game = FlappyGame()
+        trainer = NEATTrainer(config_path, action_repeat=action_repeat)
+        
+        # Train the AI
+        winner = trainer.train(game, generations=100)
     
     print("Training completed!")
     print(f"Best fitness: {winner.fitness}")
 
 if __name__ == "__main__":
-    train() 
\ No newline at end of file
+    train()